@@ -1,9 +1,14 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
 import os
-import subprocess
-from zipfile import ZipFile
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from model_server import ModelServer, TNFD_GENERATOR_SCRIPT
+from jobs import JobManager
+from zip_stream import pdf_signature, cached_archive, stream_and_cache
 
 app = FastAPI()
 
@@ -18,32 +23,107 @@ app.add_middleware(
 
 #  Paths
 REPORTS_DIR = "data/reports"
-TNFD_GENERATOR_SCRIPT = "dashboard/reports/generate_tnfd_report.py"
+#  /predict only reads inputs under this directory
+PREDICT_DATA_ROOT = os.environ.get("PREDICT_DATA_ROOT", "data")
+#  Kept outside REPORTS_DIR so the archive never ends up zipping itself
+ZIP_CACHE_PATH = "data/cache/All_Company_ESG_Reports.zip"
+
+#  Models and report tooling are loaded once and reused by every request
+model_server = ModelServer(tnfd_script=TNFD_GENERATOR_SCRIPT)
+
+#  Report jobs run on a bounded worker pool; every report type rebuilds the same
+#  PDFs, so they share one dedupe key and concurrent callers join the running job
+job_manager = JobManager()
+TNFD_JOB_KEY = "tnfd-reports"
+
+@app.on_event("startup")
+def load_model_server():
+    model_server.start()
+
+@app.on_event("shutdown")
+def stop_job_manager():
+    job_manager.shutdown()
+
+def submit_report_job(report_type):
+    return job_manager.submit(
+        TNFD_JOB_KEY,
+        lambda progress: model_server.generate_reports(on_progress=progress),
+        items=model_server.report_companies,
+        report_type=report_type,
+    )
+
+#  Endpoint to queue ESG report generation (returns a job id to poll)
+@app.post("/generate-report/{report_type}", status_code=202)
+def queue_report(report_type: str):
+    try:
+        job_id, created = submit_report_job(report_type)
+        print(f" API Triggered: POST /generate-report/{report_type} -> job {job_id} ({'new' if created else 'joined'})")
+        return {"job_id": job_id, "status": job_manager.get(job_id)["status"], "joined": not created}
+    except Exception as e:
+        print(" Report job submission error:", str(e))
+        raise HTTPException(status_code=500, detail=str(e))
 
-#  Endpoint to generate ESG report
+#  Endpoint to generate ESG report (waits on the shared job)
 @app.get("/generate-report/{report_type}")
 def generate_report(report_type: str):
     try:
         print(f" API Triggered: /generate-report/{report_type}")
 
         # Only run TNFD PDF generation (multi_org_report.json is assumed pre-generated)
-        result = subprocess.run(
-            ["python", TNFD_GENERATOR_SCRIPT],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            print(" TNFD Generator stderr:\n", result.stderr)
-            raise HTTPException(status_code=500, detail="Report generation failed")
+        job_id, _ = submit_report_job(report_type)
+        job = job_manager.wait(job_id)
+        if job["status"] != "completed":
+            raise HTTPException(status_code=500, detail=job["error"] or "Report generation failed")
 
         print(" TNFD report generation complete.")
-        return {"message": f"{report_type.capitalize()} report generated successfully."}
+        return {"message": f"{report_type.capitalize()} report generated successfully.", "job_id": job_id}
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(" Report generation exception:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+#  Job status with per-company progress
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job found: {job_id}")
+    return job
+
+#  Direct model prediction against the preloaded models
+class PredictRequest(BaseModel):
+    image: str
+    model: str
+
+#  Resolved input path (symlinks and ".." included), or None when it is outside PREDICT_DATA_ROOT
+def resolve_input_path(path):
+    root = os.path.realpath(PREDICT_DATA_ROOT)
+    resolved = os.path.realpath(path)
+    return resolved if os.path.commonpath([root, resolved]) == root else None
+
+@app.post("/predict")
+def predict(request: PredictRequest):
+    image_path = resolve_input_path(request.image)
+    if image_path is None:
+        raise HTTPException(status_code=400, detail=f"Input must be under {PREDICT_DATA_ROOT}/: {request.image}")
+    if not os.path.exists(image_path):
+        raise HTTPException(status_code=404, detail=f"Input not found: {request.image}")
+    try:
+        if request.model == "biodiversity":
+            score = model_server.predict_biodiversity(image_path)
+        elif request.model in ("deforestation", "water"):
+            score = model_server.predict_image(request.model, image_path)
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown model: {request.model}")
+        return {"model": request.model, "score": score}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(" Prediction error:", str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Endpoint to download report for a company
 @app.get("/download-report/{company_name}")
 def download_report_by_company(company_name: str):
@@ -60,19 +140,24 @@ def download_report_by_company(company_name: str):
         print(f" Error sending report: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-#  Download all PDFs as a zip
+#  Download all PDFs as a zip, streamed as it is built (or reused while no PDF changed)
 @app.get("/download-all-reports")
 def download_all_reports():
     try:
-        zip_path = os.path.join(REPORTS_DIR, "All_Company_ESG_Reports.zip")
+        zip_name = "All_Company_ESG_Reports.zip"
+        signature = pdf_signature(REPORTS_DIR)
 
-        with ZipFile(zip_path, "w") as zipf:
-            for file in os.listdir(REPORTS_DIR):
-                if file.endswith(".pdf"):
-                    zipf.write(os.path.join(REPORTS_DIR, file), arcname=file)
+        cached = cached_archive(ZIP_CACHE_PATH, signature)
+        if cached:
+            print(f" Sending cached ZIP: {cached}")
+            return FileResponse(cached, filename=zip_name, media_type="application/zip")
 
-        print(f" Sending ZIP: {zip_path}")
-        return FileResponse(zip_path, filename="All_Company_ESG_Reports.zip", media_type="application/zip")
+        print(f" Streaming ZIP of {len(signature)} reports")
+        return StreamingResponse(
+            stream_and_cache(REPORTS_DIR, signature, ZIP_CACHE_PATH),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{zip_name}"'},
+        )
     except Exception as e:
         print(" ZIP creation error:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
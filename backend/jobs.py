@@ -0,0 +1,111 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+#  Worker threads for CPU-heavy jobs, and how many finished jobs stay queryable
+MAX_WORKERS = 2
+MAX_FINISHED_JOBS = 100
+
+
+#  Background job runner: bounded pool, per-item progress, in-flight de-duplication
+class JobManager:
+    def __init__(self, max_workers=MAX_WORKERS, max_finished=MAX_FINISHED_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._max_finished = max_finished
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._futures = {}
+        self._active = {}  # dedupe key -> id of the queued/running job
+
+    #  Queue fn(progress) under key; a job already in flight for key is joined instead.
+    #  items (or a callable returning them) seeds the per-item progress table.
+    def submit(self, key, fn, items=(), **meta):
+        with self._lock:
+            if key in self._active:
+                job = self._jobs[self._active[key]]
+                job["joined"] += 1
+                return job["id"], False
+
+            if callable(items):
+                items = items()
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "key": key,
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+                "joined": 0,
+                "progress": {item: "pending" for item in items},
+                "errors": {},
+                **meta,
+            }
+            self._active[key] = job_id
+            self._futures[job_id] = self._executor.submit(self._run, job_id, fn)
+            return job_id, True
+
+    def _run(self, job_id, fn):
+        self._update(job_id, status="running", started_at=time.time())
+
+        def progress(item, status, error=None):
+            with self._lock:
+                job = self._jobs[job_id]
+                job["progress"][item] = status
+                if error:
+                    job["errors"][item] = error
+
+        try:
+            fn(progress)
+            self._finish(job_id, "completed")
+        except Exception as e:
+            print(f" Job {job_id} failed: {e}")
+            self._finish(job_id, "failed", str(e))
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _finish(self, job_id, status, error=None):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(status=status, error=error, finished_at=time.time())
+            if self._active.get(job["key"]) == job_id:
+                del self._active[job["key"]]
+            self._futures.pop(job_id, None)
+            self._evict_finished()
+
+    #  Drop the oldest finished jobs beyond the retention limit (lock held)
+    def _evict_finished(self):
+        finished = [job for job in self._jobs.values() if job["finished_at"] is not None]
+        finished.sort(key=lambda job: job["finished_at"])
+        for job in finished[:max(0, len(finished) - self._max_finished)]:
+            del self._jobs[job["id"]]
+
+    #  Snapshot of a job's state with progress counts, or None if unknown
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job, progress=dict(job["progress"]), errors=dict(job["errors"]))
+
+        counts = {}
+        for status in snapshot["progress"].values():
+            counts[status] = counts.get(status, 0) + 1
+        snapshot["total"] = len(snapshot["progress"])
+        snapshot["counts"] = counts
+        return snapshot
+
+    #  Block until a job has finished (or timeout) and return its snapshot
+    def wait(self, job_id, timeout=None):
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+        return self.get(job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
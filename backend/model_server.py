@@ -0,0 +1,95 @@
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from raster_io import load_standardized_tile
+from model_registry import ModelRegistry, MODELS_DIR
+from biodiversity_cache import cached_mean_prediction
+
+#  Paths (relative to the repository root, where the server is launched)
+TNFD_GENERATOR_SCRIPT = "dashboard/reports/generate_tnfd_report.py"
+
+IMG_SIZE = (128, 128)
+
+#  Render processes for API-triggered report runs (1 = serial)
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", os.cpu_count() or 1))
+
+#  API model names -> model registry names
+MODEL_ALIASES = {"water": "water_pollution"}
+
+
+#  Import a standalone script (e.g. the TNFD generator) as a module; registering it
+#  in sys.modules keeps its functions picklable for process-pool workers, and putting its
+#  folder on sys.path lets spawned workers import it by name
+def load_script_module(name, path):
+    script_dir = os.path.dirname(os.path.abspath(path))
+    if script_dir not in sys.path:
+        sys.path.append(script_dir)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+#  Long-lived worker that keeps models and report tooling in memory
+class ModelServer:
+    def __init__(self, models_dir=MODELS_DIR, tnfd_script=TNFD_GENERATOR_SCRIPT, report_workers=REPORT_WORKERS):
+        self.registry = ModelRegistry(models_dir)
+        self.tnfd_script = tnfd_script
+        self.report_workers = report_workers
+        self.tnfd = None
+        self.ready = False
+        self._report_lock = threading.Lock()
+
+    #  Load every model and the report generator once, at server startup
+    def start(self):
+        if self.ready:
+            return
+
+        start_time = time.perf_counter()
+
+        # Headless backend: pyplot must not try to open a display inside the server
+        import matplotlib
+        matplotlib.use("Agg")
+
+        self.registry.preload()
+        self.tnfd = load_script_module("generate_tnfd_report", self.tnfd_script)
+        self.ready = True
+
+        loaded = [name for name in self.registry.specs if self.registry.is_loaded(name)]
+        print(f"✅ Model server ready ({len(loaded)} models) in {time.perf_counter() - start_time:.2f}s")
+
+    def get_model(self, name):
+        return self.registry.get(MODEL_ALIASES.get(name, name))
+
+    #  Run one forward pass over an already-prepared input batch
+    def predict(self, name, inputs):
+        model = self.get_model(name)
+        return np.asarray(model.predict_on_batch(np.asarray(inputs, dtype=np.float32)))
+
+    #  Score a single-band GeoTIFF with the deforestation or water model
+    def predict_image(self, name, image_path):
+        image = load_standardized_tile(image_path, IMG_SIZE)
+        return float(self.predict(name, image)[0][0])
+
+    #  Mean biodiversity loss risk over the trends in a processed file; per-population results are
+    #  cached, so only new or changed series run through the LSTM
+    def predict_biodiversity(self, json_path):
+        predict_fn = lambda X: self.predict("biodiversity", X)
+        model_path = self.registry.path_for("biodiversity")
+        return float(cached_mean_prediction(json_path, predict_fn, model_path))
+
+    #  Build the TNFD PDFs on report_workers processes (pyplot is not thread-safe, so runs are serialized)
+    def generate_reports(self, on_progress=None):
+        with self._report_lock:
+            self.tnfd.generate_tnfd_reports(on_progress=on_progress, workers=self.report_workers)
+
+    #  Company names the next report run will cover (used for job progress)
+    def report_companies(self):
+        return list(self.tnfd.load_esg_data().keys())
@@ -0,0 +1,115 @@
+import json
+import os
+import uuid
+from zipfile import ZipFile, ZIP_STORED
+
+#  Bytes read from each PDF per step; bounds memory regardless of archive size
+CHUNK_SIZE = 64 * 1024
+
+
+#  Write-only sink that hands finished bytes back to the generator
+class _ChunkBuffer:
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+#  (name, mtime_ns, size) of every PDF; changes whenever any report is added, removed or rebuilt
+def pdf_signature(reports_dir):
+    signature = []
+    for entry in sorted(os.scandir(reports_dir), key=lambda e: e.name):
+        if entry.is_file() and entry.name.endswith(".pdf"):
+            stat = entry.stat()
+            signature.append([entry.name, stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+#  Yield a ZIP of files as it is built; PDFs are already compressed, so entries are stored.
+#  If tee_path is given, the archive is also written there (atomically, only once complete).
+def stream_zip(files, tee_path=None):
+    buffer = _ChunkBuffer()
+    tee = None
+    tmp_path = None
+    if tee_path:
+        os.makedirs(os.path.dirname(tee_path) or ".", exist_ok=True)
+        tmp_path = f"{tee_path}.{uuid.uuid4().hex}.tmp"
+        tee = open(tmp_path, "wb")
+
+    def emit():
+        data = buffer.drain()
+        if tee and data:
+            tee.write(data)
+        return data
+
+    try:
+        with ZipFile(buffer, "w", compression=ZIP_STORED) as zipf:
+            for path, arcname in files:
+                with open(path, "rb") as src, zipf.open(arcname, "w", force_zip64=True) as dst:
+                    while True:
+                        block = src.read(CHUNK_SIZE)
+                        if not block:
+                            break
+                        dst.write(block)
+                        data = emit()
+                        if data:
+                            yield data
+                data = emit()
+                if data:
+                    yield data
+        data = emit()
+        if data:
+            yield data
+
+        if tee:
+            tee.close()
+            os.replace(tmp_path, tee_path)
+            tee = None
+    finally:
+        if tee:
+            tee.close()
+            os.remove(tmp_path)
+
+
+#  Cached archive path if it was built from exactly this signature, else None
+def cached_archive(zip_path, signature):
+    meta_path = f"{zip_path}.json"
+    if not (os.path.exists(zip_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, "r") as f:
+            if json.load(f) != signature:
+                return None
+    except (OSError, ValueError):
+        return None
+    return zip_path
+
+
+#  Stream an archive of the given signature, caching it at zip_path once complete
+def stream_and_cache(reports_dir, signature, zip_path):
+    meta_path = f"{zip_path}.json"
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    files = [(os.path.join(reports_dir, name), name) for name, _, _ in signature]
+    yield from stream_zip(files, tee_path=zip_path)
+
+    # Only mark the archive reusable if no report changed while it was being built
+    if pdf_signature(reports_dir) == signature:
+        with open(meta_path, "w") as f:
+            json.dump(signature, f)
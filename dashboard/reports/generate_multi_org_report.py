@@ -1,98 +1,194 @@
 import os  # ✅ Add this line
+import sys
 import json
-import pandas as pd
 import numpy as np
-import tensorflow as tf
-import rasterio
-import cv2
 import ee
 import geemap
 import time
-
-
-#  Initialize Google Earth Engine
-ee.Initialize(project="ee-sbishnoi29")
-
-#  Load Trained AI Models
-deforestation_model = tf.keras.models.load_model("models/deforestation_model.h5")
-water_pollution_model = tf.keras.models.load_model("models/water_pollution_model.h5")
-biodiversity_model = tf.keras.models.load_model("models/biodiversity_model.h5", compile=False)
-biodiversity_model.compile(loss="mse", optimizer="adam")
-capital_model = tf.keras.models.load_model("models/natural_capital_model.h5", compile=False)
-capital_model.compile(loss="mse", optimizer="adam")
-
-#  Fetch Real-Time Satellite Data
-def fetch_real_time_satellite_data(latitude, longitude, save_path):
-    try:
-        region = ee.Geometry.Point([longitude, latitude]).buffer(2500)
-
-        sentinel = ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED") \
-            .filterBounds(region) \
-            .filterDate("2024-01-01", "2024-12-31") \
-            .median()
-
-        ndvi = sentinel.normalizedDifference(['B8', 'B4'])
-        ndwi = sentinel.normalizedDifference(['B3', 'B8'])
-
-        os.makedirs(save_path, exist_ok=True)
-
-        geemap.ee_export_image(ndvi, filename=f"{save_path}/ndvi_real_time.tif", scale=10, region=region)
-        geemap.ee_export_image(ndwi, filename=f"{save_path}/ndwi_real_time.tif", scale=10, region=region)
-
-        print(f"✅ Real-time satellite data updated at {save_path}")
-    except Exception as e:
-        print(f" Error fetching real-time satellite data: {e}")
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"))
+from raster_io import load_standardized_tile
+from model_registry import get_model
+from land_use_data import iter_land_use, read_columns, land_type_codes
+from satellite_cache import SatelliteTileCache, tile_params
+from site_scoring import TileIndex, TILE_SOURCES, score_sites
+
+#  Trained AI models are loaded lazily on first use by the shared model registry
+
+#  Initialize Google Earth Engine (once, on first fetch)
+_ee_initialized = False
+
+def init_earth_engine():
+    global _ee_initialized
+    if not _ee_initialized:
+        ee.Initialize(project="ee-sbishnoi29")
+        _ee_initialized = True
+
+#  Real-time imagery parameters; each (location, dates, index, scale, buffer) tile is cached on disk
+DEFAULT_LOCATION = (-3.4653, -62.2159)  # Amazon rainforest, used when the CSV has no coordinates
+DATE_RANGE = ("2024-01-01", "2024-12-31")
+SCALE = 10
+BUFFER_M = 2500
+SPECTRAL_INDICES = {"ndvi": ["B8", "B4"], "ndwi": ["B3", "B8"]}
+FETCH_WORKERS = 4
+
+#  Export one spectral index tile around a point (fetch function for the tile cache)
+def export_index_tile(params, path):
+    init_earth_engine()
+    region = ee.Geometry.Point([params["longitude"], params["latitude"]]).buffer(params["buffer_m"])
+
+    sentinel = ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED") \
+        .filterBounds(region) \
+        .filterDate(params["start_date"], params["end_date"]) \
+        .median()
+
+    image = sentinel.normalizedDifference(SPECTRAL_INDICES[params["index"]])
+    geemap.ee_export_image(image, filename=path, scale=params["scale"], region=region)
+
+#  Fetch Real-Time Satellite Data: {"ndvi": path, "ndwi": path} (None where the export failed),
+#  served from the tile cache while fresh
+def fetch_real_time_satellite_data(latitude, longitude, cache):
+    tiles = {}
+    for index in SPECTRAL_INDICES:
+        params = tile_params(latitude, longitude, DATE_RANGE[0], DATE_RANGE[1], index, SCALE, BUFFER_M)
+        try:
+            tiles[index] = cache.get_or_fetch(params, export_index_tile)
+        except Exception as e:
+            print(f" Error fetching real-time {index} data for ({latitude}, {longitude}): {e}")
+            tiles[index] = None
+    return tiles
 
 #  Load TIFF Images
 def load_tiff(file_path):
     try:
-        with rasterio.open(file_path) as dataset:
-            image = dataset.read(1)
-            image = (image - np.mean(image)) / (np.std(image) + 1e-7)
-            image_resized = cv2.resize(image, (128, 128), interpolation=cv2.INTER_AREA)
-            return np.clip(image_resized, 0, 1).reshape(1, 128, 128, 1)
+        return load_standardized_tile(file_path, (128, 128))
     except Exception as e:
         print(f" Error loading TIFF file {file_path}: {e}")
         return np.zeros((1, 128, 128, 1))
 
+#  Companies scored per forward pass (bounds memory for very large CSVs)
+BATCH_SIZE = 4096
+
+LAND_TYPE_MAPPING = {"Forest": 1, "Wetland": 2, "Agricultural": 3, "Urban": 4}
+
+RECOMMENDATIONS = [
+    "🌳 Improve forest conservation policies.",
+    "🌊 Reduce industrial water discharge.",
+    "🦜 Increase biodiversity restoration funding."
+]
+
+#  Company coordinates rounded like the tile cache keys, so companies at one site share a fetch
+def company_locations(chunk):
+    if {"latitude", "longitude"}.issubset(chunk.columns):
+        latitudes = chunk["latitude"].to_numpy(dtype=np.float64).round(4)
+        longitudes = chunk["longitude"].to_numpy(dtype=np.float64).round(4)
+        return [DEFAULT_LOCATION if np.isnan(lat) or np.isnan(lon) else (lat, lon)
+                for lat, lon in zip(latitudes, longitudes)]
+    return [DEFAULT_LOCATION] * len(chunk)
+
+#  Company footprints (min_lon, min_lat, max_lon, max_lat) when the CSV provides them
+FOOTPRINT_COLUMNS = ["min_lon", "min_lat", "max_lon", "max_lat"]
+
+def company_footprints(chunk):
+    if not set(FOOTPRINT_COLUMNS).issubset(chunk.columns):
+        return None
+    boxes = chunk[FOOTPRINT_COLUMNS].to_numpy(dtype=np.float64)
+    return [None if np.isnan(box).any() else tuple(box) for box in boxes]
+
+#  Per-company risk from windows of the downloaded tiles around each company; companies outside
+#  every indexed tile fall back to the real-time tile of their location
+def score_company_sites(chunk, site_indexes, cache, location_scores):
+    locations = company_locations(chunk)
+    latitudes, longitudes = np.array(locations, dtype=np.float64).T
+    footprints = company_footprints(chunk)
+
+    scores = [score_sites(site_indexes[name], get_model(name), longitudes, latitudes, footprints)
+              for name in ("deforestation", "water_pollution")]
+    uncovered = np.flatnonzero(np.isnan(scores[0]) | np.isnan(scores[1]))
+    if len(uncovered):
+        fallback_locations = [locations[i] for i in uncovered]
+        score_locations(fallback_locations, cache, location_scores)
+        fallback = np.array([location_scores[location] for location in fallback_locations])
+        for i, score in enumerate(scores):
+            score[uncovered] = np.where(np.isnan(score[uncovered]), fallback[:, i], score[uncovered])
+    return scores[0], scores[1]
+
+#  Deforestation / water risk for each new location: tiles are fetched concurrently (or read from
+#  the cache) and scored with one forward pass per model
+def score_locations(locations, cache, scores):
+    new_locations = [location for location in dict.fromkeys(locations) if location not in scores]
+    if not new_locations:
+        return
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        tiles = list(executor.map(lambda location: fetch_real_time_satellite_data(*location, cache), new_locations))
+
+    blank = np.zeros((1, 128, 128, 1))  # Same fallback as load_tiff for a failed export
+    ndvi = np.concatenate([load_tiff(t["ndvi"]) if t["ndvi"] else blank for t in tiles])
+    ndwi = np.concatenate([load_tiff(t["ndwi"]) if t["ndwi"] else blank for t in tiles])
+    deforestation = np.asarray(get_model("deforestation").predict_on_batch(ndvi))[:, 0]
+    water = np.asarray(get_model("water_pollution").predict_on_batch(ndwi))[:, 0]
+    scores.update(zip(new_locations, zip(deforestation.tolist(), water.tolist())))
+
+#  Score a chunk of companies with one forward pass per model
+#  (deforestation_risk / water_pollution: one value per company, or one shared value)
+def score_companies(chunk, deforestation_risk, water_pollution):
+    deforestation_risk = np.broadcast_to(deforestation_risk, len(chunk))
+    water_pollution = np.broadcast_to(water_pollution, len(chunk))
+
+    biodiversity_input = chunk["biodiversity_index"].to_numpy(dtype=np.float32).reshape(-1, 1, 1)
+    biodiversity_loss = np.asarray(get_model("biodiversity").predict_on_batch(biodiversity_input))
+    biodiversity_loss = biodiversity_loss.reshape(len(chunk), -1).mean(axis=1)
+
+    capital_input = np.column_stack([
+        chunk["land_area"].to_numpy(dtype=np.float32),
+        land_type_codes(chunk["land_type"], LAND_TYPE_MAPPING),
+        chunk["biodiversity_index"].to_numpy(dtype=np.float32),
+        chunk["carbon_sequestration"].to_numpy(dtype=np.float32),
+    ])
+    natural_capital_value = np.asarray(get_model("natural_capital").predict_on_batch(capital_input))[:, 0]
+
+    reports = {}
+    for company_name, deforestation, water, loss, capital in zip(
+            chunk["company"], deforestation_risk, water_pollution, biodiversity_loss, natural_capital_value):
+        reports[company_name] = {
+            "Deforestation Risk": float(deforestation),
+            "Water Pollution Score": float(water),
+            "Biodiversity Loss Risk": float(loss),
+            "Natural Capital Value ($)": float(capital),
+            "Recommendations": list(RECOMMENDATIONS)
+        }
+    return reports
+
 #  Generate Real-Time ESG Report
-def generate_real_time_esg_report(company_csv, output_json="data/multi_org_report.json"):
+def generate_real_time_esg_report(company_csv, output_json="data/multi_org_report.json", batch_size=BATCH_SIZE,
+                                  cache_dir="data/geospatial/cache"):
     try:
-        fetch_real_time_satellite_data(latitude=-3.4653, longitude=-62.2159, save_path="data/geospatial")
-
-        df = pd.read_csv(company_csv)
-        df["land_area"] = df["land_area"].astype(float)
-        df["biodiversity_index"] = df["biodiversity_index"].astype(float)
-        df["carbon_sequestration"] = df["carbon_sequestration"].astype(float)
+        #  Companies are scored on windows of the downloaded tiles found through a spatial index;
+        #  locations outside them use real-time tiles, cached across runs and fetched once per
+        #  distinct location
+        site_indexes = {name: TileIndex.from_sources(sources) for name, sources in TILE_SOURCES.items()}
+        print(" Indexed tiles: " + ", ".join(f"{name} {len(index)}" for name, index in site_indexes.items()))
+        cache = SatelliteTileCache(cache_dir)
+        location_scores = {}
 
         reports = {}
 
-        for i, row in df.iterrows():
-            print(f" Processing {i+1}/{len(df)}: {row['company']}")
-
-            company_name = row["company"]
-
-            deforestation_risk = deforestation_model.predict(load_tiff("data/geospatial/ndvi_real_time.tif"), verbose=0)[0][0]
-            water_pollution = water_pollution_model.predict(load_tiff("data/geospatial/ndwi_real_time.tif"), verbose=0)[0][0]
-            biodiversity_loss = np.mean(biodiversity_model.predict(np.array([[row["biodiversity_index"]]]), verbose=0))
-
-            land_type_mapping = {"Forest": 1, "Wetland": 2, "Agricultural": 3, "Urban": 4}
-            land_type_numeric = land_type_mapping.get(row["land_type"], 0)
-
-            input_data = np.array([[row["land_area"], land_type_numeric, row["biodiversity_index"], row["carbon_sequestration"]]], dtype=np.float32)
-            natural_capital_value = capital_model.predict(input_data, verbose=0)[0][0]
-
-            reports[company_name] = {
-                "Deforestation Risk": float(deforestation_risk),
-                "Water Pollution Score": float(water_pollution),
-                "Biodiversity Loss Risk": float(biodiversity_loss),
-                "Natural Capital Value ($)": float(natural_capital_value),
-                "Recommendations": [
-                    "🌳 Improve forest conservation policies.",
-                    "🌊 Reduce industrial water discharge.",
-                    "🦜 Increase biodiversity restoration funding."
-                ]
-            }
+        #  Companies are streamed in batch_size chunks with compact dtypes
+        columns = ["company", "land_area", "land_type", "biodiversity_index", "carbon_sequestration"]
+        available = read_columns(company_csv)
+        columns += [column for column in ["latitude", "longitude"] + FOOTPRINT_COLUMNS if column in available]
+        start = 0
+        try:
+            for chunk in iter_land_use(company_csv, chunksize=batch_size, columns=columns):
+                print(f" Processing {start + 1}-{start + len(chunk)}")
+                deforestation_risk, water_pollution = score_company_sites(chunk, site_indexes, cache, location_scores)
+                reports.update(score_companies(chunk, deforestation_risk, water_pollution))
+                start += len(chunk)
+        finally:
+            cache.evict()
+            cache.save()
 
         with open(output_json, "w") as f:
             json.dump(reports, f, indent=4)
@@ -103,4 +199,5 @@ def generate_real_time_esg_report(company_csv, output_json="data/multi_org_repor
         print(f" Error generating ESG report: {e}")
 
 # Run the Report Generator
-generate_real_time_esg_report("data/land_use/organization_land_use.csv")
+if __name__ == "__main__":
+    generate_real_time_esg_report("data/land_use/organization_land_use.csv")
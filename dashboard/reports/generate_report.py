@@ -1,49 +1,37 @@
 import json
-import numpy as np
-import rasterio
-import tensorflow as tf
+import os
+import sys
 
-# Load Trained Models
-deforestation_model = tf.keras.models.load_model("models/deforestation_model.h5")
-water_pollution_model = tf.keras.models.load_model("models/water_pollution_model.h5")
-biodiversity_model = tf.keras.models.load_model("models/biodiversity_model.h5", compile=False)
-biodiversity_model.compile(loss="mse", optimizer="adam")  # Recompile if needed
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"))
+from raster_io import load_standardized_tile
+from model_registry import registry, get_model
+from biodiversity_cache import cached_mean_prediction
+
+# Trained models are loaded lazily on first use by the shared model registry
 
 # Define Image Size
 IMG_SIZE = (128, 128)
 
 # Function to Load & Preprocess TIFF Images
 def load_tiff_image(file_path):
-    with rasterio.open(file_path) as dataset:
-        image = dataset.read(1)  # Read single-band (grayscale)
-        image = (image - np.mean(image)) / (np.std(image) + 1e-7)  # Standardize
-        image = np.clip(image, 0, 1)
-        image_resized = np.resize(image, IMG_SIZE).reshape(1, IMG_SIZE[0], IMG_SIZE[1], 1)
-    return image_resized
+    return load_standardized_tile(file_path, IMG_SIZE)
 
 # Function to Predict Deforestation
 def predict_deforestation(image_path):
     image = load_tiff_image(image_path)
-    prediction = deforestation_model.predict(image)
+    prediction = get_model("deforestation").predict(image)
     return float(prediction[0][0])
 
 # Function to Predict Water Pollution
 def predict_water_pollution(image_path):
     image = load_tiff_image(image_path)
-    prediction = water_pollution_model.predict(image)
+    prediction = get_model("water_pollution").predict(image)
     return float(prediction[0][0])
 
 # Function to Predict Biodiversity Loss
 def predict_biodiversity(json_path):
-    with open(json_path, "r") as f:
-        data = json.load(f)
-    X = []
-    for entry in data:
-        if "normalized_trend" in entry and len(entry["normalized_trend"]) > 1:
-            X.append(entry["normalized_trend"][:-1])
-    X = np.array(X).reshape(-1, len(X[0]), 1)
-    predictions = biodiversity_model.predict(X)
-    return float(np.mean(predictions))
+    model = get_model("biodiversity")
+    return float(cached_mean_prediction(json_path, model.predict_on_batch, registry.path_for("biodiversity")))
 
 # Generate ESG Report
 def generate_esg_report(deforestation_image, water_image, biodiversity_json, output_file="data/esg_report.json"):
@@ -1,14 +1,27 @@
+import argparse
 import json
+import multiprocessing
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from report_cache import ReportCache, report_key, MANIFEST_PATH, MAX_AGE_DAYS
+
 # Paths
 REPORT_JSON = "data/multi_org_report.json"
 PDF_REPORT_DIR = "data/reports"
 
+# Bump whenever the chart or PDF layout changes so cached reports are rebuilt
+TEMPLATE_VERSION = 1
+
 # Ensure folder exists
 os.makedirs(PDF_REPORT_DIR, exist_ok=True)
 
@@ -19,6 +32,13 @@ def load_esg_data():
             return json.load(f)
     return {}
 
+# Output paths for one company
+def pdf_path_for(company_name):
+    return os.path.join(PDF_REPORT_DIR, f"{company_name.replace(' ', '_')}.pdf")
+
+def chart_path_for(company_name):
+    return os.path.join(PDF_REPORT_DIR, f"{company_name.replace(' ', '_')}_chart.png")
+
 # Save summary chart
 def save_summary_chart(company_name, data):
     labels = ['Deforestation', 'Water Pollution', 'Biodiversity Loss']
@@ -35,14 +55,14 @@ def save_summary_chart(company_name, data):
     plt.ylim(0, 1)
     plt.tight_layout()
 
-    chart_path = os.path.join(PDF_REPORT_DIR, f"{company_name.replace(' ', '_')}_chart.png")
+    chart_path = chart_path_for(company_name)
     plt.savefig(chart_path)
     plt.close()
     return chart_path
 
 # Generate one report
 def generate_pdf_report(company_name, data):
-    filename = os.path.join(PDF_REPORT_DIR, f"{company_name.replace(' ', '_')}.pdf")
+    filename = pdf_path_for(company_name)
     doc = SimpleDocTemplate(filename, pagesize=A4)
     styles = getSampleStyleSheet()
     story = []
@@ -104,21 +124,92 @@ def generate_pdf_report(company_name, data):
     doc.build(story)
     return filename
 
-# Generate all
-def generate_tnfd_reports():
+# Render one company in a worker; errors are returned, not raised, so one bad record can't sink the batch
+def render_company(item):
+    company, data = item
+    try:
+        return company, generate_pdf_report(company, data), None
+    except Exception as e:
+        return company, None, str(e)
+
+# Generate all (on_progress, if given, is called as on_progress(company, status, error))
+# workers > 1 renders companies in a process pool, dispatching chunksize companies per task.
+# Companies whose input record and template are unchanged since the last run are skipped
+# unless force=True.
+def generate_tnfd_reports(on_progress=None, workers=1, chunksize=None, force=False, cache=None):
     esg_data = load_esg_data()
     if not esg_data:
         print(" No ESG data found.")
         return
 
     print("📄 Generating TNFD ESG Reports...")
+    cache = cache or ReportCache()
+    keys = {company: report_key(data, TEMPLATE_VERSION) for company, data in esg_data.items()}
+
+    items = []
     for company, data in esg_data.items():
-        try:
-            pdf_file = generate_pdf_report(company, data)
-            print(f"✅ {company} Report Saved: {pdf_file}")
-        except Exception as e:
-            print(f"Failed for {company}: {e}")
+        if not force and cache.is_fresh(company, keys[company]):
+            if on_progress:
+                on_progress(company, "cached", None)
+        else:
+            items.append((company, data))
+    print(f" {len(items)} of {len(esg_data)} reports need rebuilding.")
+
+    finished = set()
+
+    def finish(result):
+        company, pdf_file, error = result
+        if error is None:
+            cache.record(company, keys[company], [pdf_file, chart_path_for(company)])
+        finished.add(company)
+        log_result(result, on_progress)
+
+    try:
+        remaining = items
+        if workers > 1 and len(items) > 1:
+            if chunksize is None:
+                chunksize = max(1, len(items) // (workers * 4))
+            print(f" Rendering {len(items)} companies with {workers} workers (chunksize={chunksize})")
+            try:
+                # spawn, not fork: the API server calls this from a threaded process with TensorFlow
+                # loaded, and forking such a process can deadlock the children
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    for result in executor.map(render_company, items, chunksize=chunksize):
+                        finish(result)
+                remaining = []
+            except BrokenProcessPool as e:
+                # A crashed worker breaks the whole pool; render what is left in this process
+                remaining = [item for item in items if item[0] not in finished]
+                print(f" Worker pool failed ({e}); rendering the remaining {len(remaining)} companies serially")
+        for item in remaining:
+            if on_progress:
+                on_progress(item[0], "running", None)
+            finish(render_company(item))
+    finally:
+        cache.evict()
+        cache.save()
+
+# Log one finished company and forward it to the progress callback
+def log_result(result, on_progress):
+    company, pdf_file, error = result
+    if error is None:
+        print(f"✅ {company} Report Saved: {pdf_file}")
+    else:
+        print(f"Failed for {company}: {error}")
+    if on_progress:
+        on_progress(company, "completed" if error is None else "failed", error)
 
 # Run
 if __name__ == "__main__":
-    generate_tnfd_reports()
+    parser = argparse.ArgumentParser(description="Generate TNFD PDF reports for every company.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel render processes (1 = serial)")
+    parser.add_argument("--chunksize", type=int, default=None, help="Companies dispatched per worker task")
+    parser.add_argument("--force", action="store_true", help="Rebuild every report, ignoring the cache")
+    parser.add_argument("--manifest", type=str, default=MANIFEST_PATH, help="Report cache manifest path")
+    parser.add_argument("--max-age-days", type=float, default=MAX_AGE_DAYS, help="Evict cached reports unused for this long")
+    parser.add_argument("--max-cache-mb", type=float, default=None, help="Evict least recently used reports above this size")
+
+    args = parser.parse_args()
+    max_bytes = int(args.max_cache_mb * 1024 * 1024) if args.max_cache_mb is not None else None
+    cache = ReportCache(args.manifest, max_age_days=args.max_age_days, max_bytes=max_bytes)
+    generate_tnfd_reports(workers=args.workers, chunksize=args.chunksize, force=args.force, cache=cache)
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import time
+
+# Manifest lives next to the reports folder (data/reports -> data/reports_manifest.json)
+MANIFEST_PATH = "data/reports_manifest.json"
+
+# Eviction defaults: drop entries unused for 30 days; no size cap unless configured
+MAX_AGE_DAYS = 30
+MAX_CACHE_BYTES = None
+
+
+# Content hash of one company's input record plus the report template version
+def report_key(record, template_version):
+    payload = json.dumps(record, sort_keys=True, default=str) + f"|template={template_version}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Manifest of generated reports keyed by company, with age/size-based eviction
+class ReportCache:
+    def __init__(self, manifest_path=MANIFEST_PATH, max_age_days=MAX_AGE_DAYS, max_bytes=MAX_CACHE_BYTES):
+        self.manifest_path = manifest_path
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.entries = self._load()
+        self._touched = set()
+
+    def _load(self):
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r") as f:
+                    return json.load(f).get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f" Ignoring unreadable report manifest {self.manifest_path}: {e}")
+        return {}
+
+    # True if the company's report was built from exactly this input and is still on disk
+    def is_fresh(self, company, key):
+        entry = self.entries.get(company)
+        if entry is None or entry["key"] != key:
+            return False
+        if not all(os.path.exists(path) for path in entry["files"]):
+            return False
+        entry["last_used"] = time.time()
+        self._touched.add(company)
+        return True
+
+    def record(self, company, key, files):
+        files = [path for path in files if path and os.path.exists(path)]
+        now = time.time()
+        self.entries[company] = {
+            "key": key,
+            "files": files,
+            "size": sum(os.path.getsize(path) for path in files),
+            "created_at": now,
+            "last_used": now,
+        }
+        self._touched.add(company)
+
+    # Remove stale entries (and their files): too old first, then least recently used over the size cap.
+    # Entries used in this run are never evicted for size.
+    def evict(self):
+        evicted = []
+        now = time.time()
+
+        if self.max_age_days is not None:
+            cutoff = now - self.max_age_days * 86400
+            evicted += [company for company, entry in self.entries.items() if entry["last_used"] < cutoff]
+
+        if self.max_bytes is not None:
+            remaining = sorted(
+                (item for item in self.entries.items() if item[0] not in evicted),
+                key=lambda item: item[1]["last_used"]
+            )
+            total = sum(entry["size"] for _, entry in remaining)
+            for company, entry in remaining:
+                if total <= self.max_bytes:
+                    break
+                if company in self._touched:
+                    continue
+                evicted.append(company)
+                total -= entry["size"]
+
+        for company in evicted:
+            for path in self.entries.pop(company)["files"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        if evicted:
+            print(f" Evicted {len(evicted)} cached report(s).")
+        return evicted
+
+    # Atomic write so an interrupted run never leaves a truncated manifest
+    def save(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
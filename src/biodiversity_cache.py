@@ -0,0 +1,206 @@
+import argparse
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from biodiversity_stream import DEFAULT_BATCH_SIZE, iter_population_batches, mean_prediction, preferred_trend_file
+from dataset_cache import file_sha256
+
+# Per-population biodiversity predictions keyed by (Binomial, Country, trend hash), one cache file
+# per scored source: data/biodiversity/cache/<source stem>_<path hash>_predictions.npz.
+# Re-scoring a refreshed file only runs the LSTM on new or changed series; populations that
+# disappeared from the source are dropped. Aggregates are answered from the cache alone.
+
+CACHE_DIR = "data/biodiversity/cache"
+
+
+# Keyed by the source's absolute path, so same-named files in different folders never share a cache
+def cache_path_for(source_path, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    path_hash = hashlib.sha256(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{stem}_{path_hash}_predictions.npz")
+
+
+# File actually scored for a processed source: a stale or missing JSON resolves to its newer
+# NDJSON/.npz sibling (see preferred_trend_file), or to the .npy when nothing else exists
+def resolve_source(source_path):
+    resolved = preferred_trend_file(source_path, with_metadata=True)
+    return resolved if os.path.exists(resolved) else preferred_trend_file(source_path)
+
+
+_model_digests = {}  # (path, mtime_ns, size) -> sha256 of the model file
+
+
+# Identifies the model that produced cached predictions; a different model invalidates them all.
+# The file is only re-hashed when its size or mtime changes.
+def model_version(model_path):
+    stat = os.stat(model_path)
+    key = (os.path.abspath(model_path), stat.st_mtime_ns, stat.st_size)
+    if key not in _model_digests:
+        _model_digests[key] = file_sha256(model_path)
+    return f"{os.path.basename(model_path)}:{_model_digests[key]}"
+
+
+# Hash of one normalized trend as stored (float32)
+def trend_hash(trend):
+    return hashlib.sha256(np.ascontiguousarray(trend, dtype=np.float32).tobytes()).hexdigest()[:32]
+
+
+class PopulationCache:
+    def __init__(self, path, version=None):
+        self.path = path
+        self.version = version
+        self.counts = {}  # (binomial, country, trend hash) -> populations sharing the key
+        self.entries = self._load()  # (binomial, country, trend hash) -> prediction
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with np.load(self.path) as data:
+                if self.version is not None and str(data["version"]) != self.version:
+                    print(f" Model changed; discarding cached biodiversity predictions in {self.path}")
+                    return {}
+                keys = list(zip(data["binomial"].tolist(), data["country"].tolist(), data["trend_hash"].tolist()))
+                counts = data["count"].tolist() if "count" in data.files else [1] * len(keys)
+                self.counts = dict(zip(keys, counts))
+                return dict(zip(keys, data["prediction"].tolist()))
+        except (OSError, ValueError, KeyError) as e:
+            print(f" Ignoring unreadable prediction cache {self.path}: {e}")
+            return {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Populations behind the cached keys (identical series share one key)
+    def population_count(self):
+        return int(self._weights().sum())
+
+    def _weights(self):
+        return np.array([self.counts.get(key, 1) for key in self.entries], dtype=np.float64)
+
+    # Keep only the given keys (the populations present in the current source), with keep mapping
+    # each key to the number of populations that share it
+    def prune(self, keep):
+        removed = len(self.entries)
+        self.entries = {key: value for key, value in self.entries.items() if key in keep}
+        self.counts = {key: keep[key] for key in self.entries}
+        return removed - len(self.entries)
+
+    # Write atomically so an interrupted run never leaves a truncated cache
+    def save(self):
+        cache_dir = os.path.dirname(self.path) or "."
+        os.makedirs(cache_dir, exist_ok=True)
+        keys = list(self.entries.keys())
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                version=np.array(self.version or ""),
+                binomial=np.array([key[0] for key in keys], dtype=str),
+                country=np.array([key[1] for key in keys], dtype=str),
+                trend_hash=np.array([key[2] for key in keys], dtype=str),
+                prediction=np.array(list(self.entries.values()), dtype=np.float32),
+                count=np.array([self.counts.get(key, 1) for key in keys], dtype=np.int64),
+            )
+        os.replace(tmp_path, self.path)
+
+    def _grouped(self, position):
+        if not self.entries:
+            return {}
+        names, inverse = np.unique([key[position] for key in self.entries], return_inverse=True)
+        predictions = np.fromiter(self.entries.values(), dtype=np.float64, count=len(self.entries))
+        weights = self._weights()
+        counts = np.bincount(inverse, weights=weights).astype(np.int64)
+        means = np.bincount(inverse, weights=predictions * weights) / counts
+        return {name: {"mean": float(mean), "count": int(count)} for name, mean, count in zip(names.tolist(), means, counts)}
+
+    # Aggregate queries, served without running the model
+    def by_species(self):
+        return self._grouped(0)
+
+    def by_country(self):
+        return self._grouped(1)
+
+    # Mean over every population; identical series are scored once but counted each time
+    def overall_mean(self):
+        if not self.entries:
+            return None
+        predictions = np.fromiter(self.entries.values(), dtype=np.float64, count=len(self.entries))
+        return float(np.average(predictions, weights=self._weights()))
+
+
+# Score every population in source_path, running predict_fn only on series missing from the cache.
+# Returns (cache, number re-scored, number reused).
+def score_populations(source_path, predict_fn, version, cache_dir=CACHE_DIR, batch_size=DEFAULT_BATCH_SIZE):
+    cache = PopulationCache(cache_path_for(source_path, cache_dir), version)
+    seen = {}  # key -> populations with that key in the source
+    pending_keys, pending_trends = [], []
+    scored = reused = 0
+
+    def flush():
+        nonlocal scored
+        if not pending_trends:
+            return
+        X = np.stack(pending_trends)[:, :-1, np.newaxis]  # Features: all years except the last
+        predictions = np.asarray(predict_fn(X), dtype=np.float32).reshape(-1)
+        cache.entries.update(zip(pending_keys, predictions.tolist()))
+        scored += len(pending_keys)
+        pending_keys.clear()
+        pending_trends.clear()
+
+    for binomials, countries, trends in iter_population_batches(source_path, batch_size):
+        for binomial, country, trend in zip(binomials, countries, trends):
+            key = (binomial, country, trend_hash(trend))
+            if key in seen:
+                seen[key] += 1
+                continue
+            seen[key] = 1
+            if key in cache.entries:
+                reused += 1
+                continue
+            pending_keys.append(key)
+            pending_trends.append(trend)
+            if len(pending_trends) == batch_size:
+                flush()
+    flush()
+
+    removed = cache.prune(seen)
+    cache.save()
+    print(f" Biodiversity predictions: {scored} scored, {reused} reused from cache, {removed} dropped ({cache.path})")
+    return cache, scored, reused
+
+
+# Mean risk over a processed file (see resolve_source) through the population cache; bare .npy
+# matrices have no population keys and are streamed through the model instead
+def cached_mean_prediction(source_path, predict_fn, model_path, cache_dir=CACHE_DIR, batch_size=DEFAULT_BATCH_SIZE):
+    source_path = resolve_source(source_path)
+    if source_path.lower().endswith(".npy"):
+        return mean_prediction(predict_fn, source_path, batch_size)
+    cache, _, _ = score_populations(source_path, predict_fn, model_version(model_path), cache_dir, batch_size)
+    if not len(cache):
+        raise ValueError(f"No normalized trends found in {source_path}")
+    return cache.overall_mean()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query cached per-population biodiversity predictions.")
+    parser.add_argument("source", type=str, help="Processed biodiversity file the predictions were made for")
+    parser.add_argument("--by", type=str, default="overall", choices=["overall", "country", "species"])
+    parser.add_argument("--cache-dir", type=str, default=CACHE_DIR)
+    parser.add_argument("--top", type=int, default=20, help="Groups to print, highest mean risk first")
+
+    args = parser.parse_args()
+    cache = PopulationCache(cache_path_for(resolve_source(args.source), args.cache_dir))
+    if not len(cache):
+        raise SystemExit(f" No cached predictions for {args.source}; run predict.py on it first")
+
+    if args.by == "overall":
+        print(f"🦜 Mean biodiversity loss risk over {cache.population_count()} populations: {cache.overall_mean():.4f}")
+    else:
+        groups = cache.by_country() if args.by == "country" else cache.by_species()
+        ranked = sorted(groups.items(), key=lambda item: item[1]["mean"], reverse=True)[:args.top]
+        for name, stats in ranked:
+            print(f"   {name:<40}{stats['mean']:>8.4f}  ({stats['count']} populations)")
@@ -0,0 +1,188 @@
+import json
+import os
+
+import numpy as np
+
+# Streaming access to processed biodiversity trends (see biodiversityloss/process_biodiversity.py).
+# Supported formats, picked by extension:
+#   .npy            float32 (N, years) normalized trend matrix, read through a memory map
+#   .ndjson/.jsonl  one {"normalized_trend": [...], ...} record per line
+#   .json           the original JSON array, decoded one record at a time
+# Readers yield fixed-size float32 batches, so peak memory depends on the batch size only.
+
+DEFAULT_BATCH_SIZE = 1024
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+TREND_EXTENSIONS = (".json", ".npy") + NDJSON_EXTENSIONS
+_READ_SIZE = 1024 * 1024
+
+
+# Decode the records of a top-level JSON array incrementally
+def _iter_json_array(path, read_size=_READ_SIZE):
+    decoder = json.JSONDecoder()
+    with open(path, "r") as f:
+        buffer = f.read(read_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"{path} is not a JSON array")
+        buffer = buffer[1:]
+        eof = False
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except ValueError:
+                if eof:
+                    raise
+                chunk = f.read(read_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield record
+            buffer = buffer[end:]
+
+
+def _iter_ndjson(path):
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# Normalized trend rows (one per population) from any supported file
+def iter_trends(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        trends = np.load(path, mmap_mode="r")
+        for start in range(0, len(trends), DEFAULT_BATCH_SIZE):
+            yield from trends[start:start + DEFAULT_BATCH_SIZE]
+        return
+
+    records = _iter_ndjson(path) if extension in NDJSON_EXTENSIONS else _iter_json_array(path)
+    for record in records:
+        trend = record.get("normalized_trend")
+        if trend is not None and len(trend) > 1:
+            yield trend
+
+
+# Fixed-size float32 LSTM batches: X (b, years - 1, 1) from all years except the last and,
+# with targets=True, y (b,) the last year
+def iter_batches(path, batch_size=DEFAULT_BATCH_SIZE, targets=False):
+    # Memory-mapped matrices are sliced directly instead of row by row
+    if path.lower().endswith(".npy"):
+        trends = np.load(path, mmap_mode="r")
+        for start in range(0, len(trends), batch_size):
+            batch = np.asarray(trends[start:start + batch_size], dtype=np.float32)
+            yield (batch[:, :-1, np.newaxis], batch[:, -1]) if targets else batch[:, :-1, np.newaxis]
+        return
+
+    batch = None
+    filled = 0
+    for trend in iter_trends(path):
+        if batch is None:
+            batch = np.empty((batch_size, len(trend)), dtype=np.float32)
+        batch[filled] = trend
+        filled += 1
+        if filled == batch_size:
+            yield (batch[:, :-1, np.newaxis].copy(), batch[:, -1].copy()) if targets else batch[:, :-1, np.newaxis].copy()
+            filled = 0
+    if filled:
+        batch = batch[:filled]
+        yield (batch[:, :-1, np.newaxis], batch[:, -1]) if targets else batch[:, :-1, np.newaxis]
+
+
+# Batches of (binomials, countries, trends (b, years) float32) from record files (.json / .ndjson)
+# or the processed trend matrix (.npz); bare .npy matrices carry no population metadata
+def iter_population_batches(path, batch_size=DEFAULT_BATCH_SIZE):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npz":
+        with np.load(path) as data:
+            binomials, countries, trends = data["binomial"], data["country"], data["trends"]
+        for start in range(0, len(trends), batch_size):
+            stop = start + batch_size
+            yield (binomials[start:stop].tolist(), countries[start:stop].tolist(),
+                   trends[start:stop].astype(np.float32, copy=False))
+        return
+    if extension == ".npy":
+        raise ValueError(f"{path} has no Binomial/Country metadata; use the JSON, NDJSON or .npz output")
+
+    records = _iter_ndjson(path) if extension in NDJSON_EXTENSIONS else _iter_json_array(path)
+    binomials, countries, trends = [], [], []
+    for record in records:
+        trend = record.get("normalized_trend")
+        if trend is None or len(trend) <= 1:
+            continue
+        binomials.append(str(record.get("Binomial", "")))
+        countries.append(str(record.get("Country", "")))
+        trends.append(trend)
+        if len(trends) == batch_size:
+            yield binomials, countries, np.array(trends, dtype=np.float32)
+            binomials, countries, trends = [], [], []
+    if trends:
+        yield binomials, countries, np.array(trends, dtype=np.float32)
+
+
+# Compact sibling of a processed JSON file (same name, .npy, then .ndjson/.jsonl, then .npz) that is
+# at least as new as the JSON; when the JSON was not written (--json-format ndjson/none) the first
+# sibling that exists. Otherwise the path itself. with_metadata skips .npy, which has no
+# Binomial/Country columns.
+def preferred_trend_file(path, with_metadata=False):
+    stem, extension = os.path.splitext(path)
+    if extension.lower() != ".json":
+        return path
+    extensions = ((() if with_metadata else (".npy",)) + NDJSON_EXTENSIONS + (".npz",))
+    candidates = [stem + ext for ext in extensions if os.path.exists(stem + ext)]
+    if not os.path.exists(path):
+        return candidates[0] if candidates else path
+    for candidate in candidates:
+        if os.path.getmtime(candidate) >= os.path.getmtime(path):
+            return candidate
+    return path
+
+
+# Whole file as one LSTM input batch (for callers that need a single array)
+def load_trends(path):
+    batches = list(iter_batches(path))
+    if not batches:
+        raise ValueError(f"No normalized trends found in {path}")
+    return np.concatenate(batches)
+
+
+# Mean model output over every population in the file, one batch in memory at a time
+def mean_prediction(predict_fn, path, batch_size=DEFAULT_BATCH_SIZE):
+    total = 0.0
+    count = 0
+    for X in iter_batches(path, batch_size):
+        predictions = np.asarray(predict_fn(X), dtype=np.float64)
+        total += predictions.sum()
+        count += predictions.size
+    if count == 0:
+        raise ValueError(f"No normalized trends found in {path}")
+    return total / count
+
+
+# Years per trend, from the header / first record only
+def trend_length(path):
+    if path.lower().endswith(".npy"):
+        return np.load(path, mmap_mode="r").shape[1]
+    for trend in iter_trends(path):
+        return len(trend)
+    raise ValueError(f"No normalized trends found in {path}")
+
+
+# tf.data pipeline of (X, y) batches streamed from disk, for model.fit; shuffle_buffer mixes
+# rows within a bounded window (the file itself is never held in memory)
+def make_trend_dataset(path, batch_size=32, shuffle_buffer=None):
+    import tensorflow as tf
+
+    years = trend_length(path)
+    dataset = tf.data.Dataset.from_generator(
+        lambda: iter_batches(path, batch_size, targets=True),
+        output_signature=(
+            tf.TensorSpec(shape=(None, years - 1, 1), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.float32),
+        ),
+    )
+    if shuffle_buffer:
+        dataset = dataset.unbatch().shuffle(shuffle_buffer).batch(batch_size)
+    return dataset.prefetch(tf.data.AUTOTUNE)
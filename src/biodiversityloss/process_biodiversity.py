@@ -1,18 +1,92 @@
 import pandas as pd
 import os
 import json
+import argparse
 import numpy as np
 
-# Ensure directories exist
-os.makedirs("data/biodiversity/train", exist_ok=True)
-os.makedirs("data/biodiversity/test", exist_ok=True)
-os.makedirs("data/biodiversity/processed", exist_ok=True)
+# Paths
+CSV_FILE = "data/biodiversity/biodiversity_loss.csv"
+TRAIN_JSON = "data/biodiversity/train/biodiversity_loss_train.json"
+TEST_JSON = "data/biodiversity/test/biodiversity_loss_test.json"
+TRENDS_NPZ = "data/biodiversity/processed/biodiversity_trends.npz"
+# Per-split float32 trend matrices, memory-mapped by the streaming loader (biodiversity_stream.py)
+TRAIN_NPY = "data/biodiversity/train/biodiversity_loss_train.npy"
+TEST_NPY = "data/biodiversity/test/biodiversity_loss_test.npy"
 
-# Path to the CSV file
-csv_file = "data/biodiversity/biodiversity_loss.csv"
+SELECTED_COLUMNS = ['Binomial', 'Common_name', 'Country']  # Adjust based on available columns
+TRAIN_FRACTION = 0.8
+
+# Linear interpolation along each row (years treated as equally spaced), matching
+# DataFrame.interpolate(method='linear', axis=1): gaps between two known values are
+# interpolated, trailing gaps repeat the last known value, leading gaps stay NaN
+def interpolate_rows(values):
+    n_rows, n_cols = values.shape
+    valid = ~np.isnan(values)
+    cols = np.broadcast_to(np.arange(n_cols), values.shape)
+
+    prev_idx = np.maximum.accumulate(np.where(valid, cols, -1), axis=1)
+    next_idx = np.minimum.accumulate(np.where(valid, cols, n_cols)[:, ::-1], axis=1)[:, ::-1]
+
+    prev_val = np.take_along_axis(values, np.clip(prev_idx, 0, n_cols - 1), axis=1)
+    next_val = np.take_along_axis(values, np.clip(next_idx, 0, n_cols - 1), axis=1)
+
+    span = np.where(next_idx > prev_idx, next_idx - prev_idx, 1)
+    weight = (cols - prev_idx) / span
+    interior = prev_val + weight * (next_val - prev_val)
+
+    result = np.where(next_idx < n_cols, interior, prev_val)  # Trailing gaps: last known value
+    return np.where(prev_idx >= 0, result, np.nan)           # Leading gaps: unchanged
+
+# Fill remaining gaps down the columns, like DataFrame.fillna(method='bfill').fillna(method='ffill')
+def fill_columns(values):
+    n_rows = values.shape[0]
+    rows = np.broadcast_to(np.arange(n_rows)[:, None], values.shape)
+
+    next_row = np.minimum.accumulate(np.where(~np.isnan(values), rows, n_rows)[::-1], axis=0)[::-1]
+    values = np.where(next_row < n_rows, np.take_along_axis(values, np.clip(next_row, 0, n_rows - 1), axis=0), np.nan)
+
+    prev_row = np.maximum.accumulate(np.where(~np.isnan(values), rows, -1), axis=0)
+    return np.where(prev_row >= 0, np.take_along_axis(values, np.clip(prev_row, 0, None), axis=0), np.nan)
+
+# Per-row min-max scaling; constant rows become all zeros
+def normalize_rows(values):
+    min_val = values.min(axis=1, keepdims=True)
+    value_range = values.max(axis=1, keepdims=True) - min_val
+    safe_range = np.where(value_range != 0, value_range, 1)
+    return np.where(value_range != 0, (values - min_val) / safe_range, 0.0)
+
+# Interpolated populations and normalized trends for a biodiversity dataframe
+def process_trends(df, year_columns):
+    values = df[year_columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    values = fill_columns(interpolate_rows(values))
+    return values, normalize_rows(values)
+
+def json_records(df, year_columns, values, trends):
+    for record, row, trend in zip(df[SELECTED_COLUMNS].to_dict(orient='records'), values.tolist(), trends.tolist()):
+        record.update(zip(year_columns, row))
+        record["normalized_trend"] = trend
+        yield record
+
+def save_json(df, year_columns, values, trends, path):
+    with open(path, "w") as f:
+        json.dump(list(json_records(df, year_columns, values, trends)), f)
+
+# One record per line, so readers can stream the file
+def save_ndjson(df, year_columns, values, trends, path):
+    with open(path, "w") as f:
+        for record in json_records(df, year_columns, values, trends):
+            f.write(json.dumps(record) + "\n")
+
+def process_biodiversity(csv_file=CSV_FILE, json_format="json"):
+    # Ensure directories exist
+    for path in (TRAIN_JSON, TEST_JSON, TRENDS_NPZ):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Check if file exists
+    if not os.path.exists(csv_file):
+        print(f"Error: {csv_file} not found. Please ensure the dataset is in the correct location.")
+        return
 
-# Check if file exists
-if os.path.exists(csv_file):
     # Read the CSV file
     df = pd.read_csv(csv_file)
 
@@ -20,44 +94,55 @@ if os.path.exists(csv_file):
     print("🔍 Preview of Biodiversity Data:")
     print(df.head())
 
-    # Select relevant columns
-    selected_columns = ['Binomial', 'Common_name', 'Country']  # Adjust based on available columns
-
     # Detect year-based population columns (e.g., 1970-2020)
-    year_columns = [col for col in df.columns if col.isdigit()]  
+    year_columns = [col for col in df.columns if col.isdigit()]
 
     # Ensure at least some years exist
     if not year_columns:
         print(" Error: No year-based population columns found!")
-    else:
-        # Keep only necessary columns
-        df = df[selected_columns + year_columns]
+        return
+
+    # Keep only necessary columns
+    df = df[SELECTED_COLUMNS + year_columns].reset_index(drop=True)
 
-        # Fill missing population data using linear interpolation
-        df[year_columns] = df[year_columns].interpolate(method='linear', axis=1).fillna(method='bfill').fillna(method='ffill')
+    # Fill missing population data and normalize every trend as whole-array operations
+    values, trends = process_trends(df, year_columns)
 
-        # Convert to JSON
-        biodiversity_data = df.to_dict(orient='records')
+    # Split into train & test
+    split = int(len(df) * TRAIN_FRACTION)
 
-        # Normalize population trends
-        for record in biodiversity_data:
-            values = [record[year] for year in year_columns]
-            min_val, max_val = min(values), max(values)
-            record["normalized_trend"] = [(val - min_val) / (max_val - min_val) if max_val != min_val else 0 for val in values]
+    # Save Train & Test Datasets
+    if json_format == "json":
+        save_json(df.iloc[:split], year_columns, values[:split], trends[:split], TRAIN_JSON)
+        save_json(df.iloc[split:], year_columns, values[split:], trends[split:], TEST_JSON)
+    elif json_format == "ndjson":
+        save_ndjson(df.iloc[:split], year_columns, values[:split], trends[:split], TRAIN_JSON[:-len(".json")] + ".ndjson")
+        save_ndjson(df.iloc[split:], year_columns, values[split:], trends[split:], TEST_JSON[:-len(".json")] + ".ndjson")
 
-        # Split into train & test
-        train_data = biodiversity_data[:int(len(biodiversity_data) * 0.8)]
-        test_data = biodiversity_data[int(len(biodiversity_data) * 0.8):]
+    # Compact float32 matrix of all normalized trends (rows [0, split) are the train set), keeping
+    # the populations the JSON readers keep (they skip trends with a single value). Written after the
+    # JSON files so preferred_trend_file sees the .npy as up to date.
+    keep = np.full(len(trends), trends.shape[1] > 1)
+    np.savez(
+        TRENDS_NPZ,
+        trends=trends[keep].astype(np.float32),
+        years=np.array(year_columns, dtype=np.int32),
+        split=np.int64(keep[:split].sum()),
+        binomial=df["Binomial"].astype(str).to_numpy()[keep],
+        country=df["Country"].astype(str).to_numpy()[keep],
+    )
+    print(f"✅ Normalized trends saved: {TRENDS_NPZ} ({int(keep.sum())} x {trends.shape[1]} float32)")
 
-        # Save Train Dataset
-        with open("data/biodiversity/train/biodiversity_loss_train.json", "w") as f:
-            json.dump(train_data, f)
+    np.save(TRAIN_NPY, trends[:split][keep[:split]].astype(np.float32))
+    np.save(TEST_NPY, trends[split:][keep[split:]].astype(np.float32))
 
-        # Save Test Dataset
-        with open("data/biodiversity/test/biodiversity_loss_test.json", "w") as f:
-            json.dump(test_data, f)
+    print("✅ Biodiversity loss train & test data processed successfully!")
 
-        print("✅ Biodiversity loss train & test data processed successfully!")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interpolate, normalize and split the biodiversity CSV.")
+    parser.add_argument("--csv", type=str, default=CSV_FILE, help="Living Planet-style CSV with year columns")
+    parser.add_argument("--json-format", type=str, default="json", choices=["json", "ndjson", "none"],
+                        help="Verbose per-population records to write next to the float32 trend matrices")
 
-else:
-    print(f"Error: {csv_file} not found. Please ensure the dataset is in the correct location.")
+    args = parser.parse_args()
+    process_biodiversity(args.csv, json_format=args.json_format)
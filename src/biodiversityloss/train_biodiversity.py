@@ -1,34 +1,28 @@
-import numpy as np
-import json
+import os
+import sys
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense
 
-# Load Biodiversity Data from JSON
-def load_biodiversity_data(json_path):
-    with open(json_path, "r") as f:
-        data = json.load(f)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from biodiversity_stream import make_trend_dataset, preferred_trend_file, trend_length
 
-    # Extract normalized population trends
-    X, y = [], []
-    for entry in data:
-        if "normalized_trend" in entry and len(entry["normalized_trend"]) > 1:
-            X.append(entry["normalized_trend"][:-1])  # Features: All years except the last
-            y.append(entry["normalized_trend"][-1])  # Target: The last year population
+BATCH_SIZE = 32
+SHUFFLE_BUFFER = 10000
 
-    return np.array(X), np.array(y)
+# Load Train & Test Data as streamed float32 batches (the .npy matrices written by
+# process_biodiversity.py are preferred over the verbose JSON when present)
+train_path = preferred_trend_file("data/biodiversity/train/biodiversity_loss_train.json")
+test_path = preferred_trend_file("data/biodiversity/test/biodiversity_loss_test.json")
+train_dataset = make_trend_dataset(train_path, BATCH_SIZE, shuffle_buffer=SHUFFLE_BUFFER)
+test_dataset = make_trend_dataset(test_path, BATCH_SIZE)
 
-# Load Train & Test Data
-X_train, y_train = load_biodiversity_data("data/biodiversity/train/biodiversity_loss_train.json")
-X_test, y_test = load_biodiversity_data("data/biodiversity/test/biodiversity_loss_test.json")
-
-# Reshape for LSTM (samples, time steps, features)
-X_train = X_train.reshape((X_train.shape[0], X_train.shape[1], 1))
-X_test = X_test.reshape((X_test.shape[0], X_test.shape[1], 1))
+# Time steps: all years except the last, which is the target
+time_steps = trend_length(train_path) - 1
 
 # Define LSTM Model
 model = Sequential([
-    LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], 1)),
+    LSTM(50, return_sequences=True, input_shape=(time_steps, 1)),
     LSTM(50),
     Dense(1, activation="linear")
 ])
@@ -37,7 +31,7 @@ model = Sequential([
 model.compile(optimizer="adam", loss="mse")
 
 # Train Model
-model.fit(X_train, y_train, epochs=20, batch_size=32, validation_data=(X_test, y_test))
+model.fit(train_dataset, epochs=20, validation_data=test_dataset)
 
 # Save Model
 model.save("models/biodiversity_model.h5")
@@ -0,0 +1,184 @@
+import csv
+import glob
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from model_registry import get_model
+from biodiversity_stream import NDJSON_EXTENSIONS
+
+# Bulk scoring pipeline: reader threads -> batched model calls -> writer thread.
+# Readers decode inputs in parallel into a bounded queue (so memory stays flat however many
+# files are scored), the main thread groups them into batches for one forward pass each, and
+# a writer thread streams per-file scores to CSV or Parquet.
+
+OUTPUT_COLUMNS = ["path", "model", "score", "error"]
+TREND_FILE_EXTENSIONS = (".json",) + NDJSON_EXTENSIONS
+_DONE = object()
+
+
+# Expand directories, globs and plain paths into a sorted, de-duplicated file list
+def collect_inputs(inputs, extensions=(".tif", ".tiff") + TREND_FILE_EXTENSIONS):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths += [os.path.join(item, name) for name in os.listdir(item) if name.lower().endswith(extensions)]
+        elif any(ch in item for ch in "*?["):
+            paths += [path for path in glob.glob(item, recursive=True) if path.lower().endswith(extensions)]
+        else:
+            paths.append(item)
+    return sorted(set(paths))
+
+
+# Default model for a file: JSON / NDJSON trend files go to the biodiversity LSTM
+def model_for(path, image_model):
+    return "biodiversity" if path.lower().endswith(TREND_FILE_EXTENSIONS) else image_model
+
+
+class _CsvSink:
+    def __init__(self, path):
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(OUTPUT_COLUMNS)
+
+    def write(self, rows):
+        self._writer.writerows([[row[col] for col in OUTPUT_COLUMNS] for row in rows])
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([("path", pa.string()), ("model", pa.string()),
+                                  ("score", pa.float64()), ("error", pa.string())])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        columns = {col: [row[col] for row in rows] for col in OUTPUT_COLUMNS}
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def open_sink(output_path):
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if output_path.lower().endswith(".parquet"):
+        return _ParquetSink(output_path)
+    return _CsvSink(output_path)
+
+
+# Score every file; load_fns maps model name -> loader returning a (n, ...) input batch for one
+# file, and reduce_fns maps model name -> function turning that file's predictions into a score
+def score_files(paths, image_model, output_path, load_fns, reduce_fns, batch_size=64, readers=4):
+    start_time = time.perf_counter()
+    work = queue.Queue()
+    loaded = queue.Queue(maxsize=max(batch_size * 2, readers * 2))
+    written = queue.Queue(maxsize=8)
+
+    for path in paths:
+        work.put(path)
+    for _ in range(readers):
+        work.put(_DONE)
+
+    def reader():
+        while True:
+            path = work.get()
+            if path is _DONE:
+                loaded.put(_DONE)
+                return
+            name = model_for(path, image_model)
+            try:
+                loaded.put((path, name, load_fns[name](path), None))
+            except Exception as e:
+                loaded.put((path, name, None, str(e)))
+
+    sink = open_sink(output_path)
+    write_errors = []
+
+    # After a failed write the writer keeps draining the queue, so the producer never blocks on it
+    def writer():
+        try:
+            while True:
+                rows = written.get()
+                if rows is _DONE:
+                    return
+                if write_errors:
+                    continue
+                try:
+                    sink.write(rows)
+                except Exception as e:
+                    write_errors.append(e)
+        finally:
+            sink.close()
+
+    # Hand rows to the writer, stopping the run as soon as a write has failed
+    def emit(rows):
+        if write_errors:
+            raise write_errors[0]
+        written.put(rows)
+
+    reader_threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    for thread in reader_threads + [writer_thread]:
+        thread.start()
+
+    pending = {}  # model name -> list of (path, inputs)
+    scored = failed = 0
+
+    # One forward pass over everything pending for a model, then split back per file
+    def flush(name):
+        nonlocal scored, failed
+        items = pending.pop(name, [])
+        if not items:
+            return
+        rows = []
+        try:
+            predictions = np.asarray(get_model(name).predict_on_batch(np.concatenate([x for _, x in items])))
+            offset = 0
+            for path, x in items:
+                score = reduce_fns[name](predictions[offset:offset + len(x)])
+                offset += len(x)
+                rows.append({"path": path, "model": name, "score": float(score), "error": None})
+            scored += len(items)
+        except Exception as e:
+            rows = [{"path": path, "model": name, "score": None, "error": str(e)} for path, _ in items]
+            failed += len(items)
+        emit(rows)
+
+    finished_readers = 0
+    try:
+        while finished_readers < readers:
+            item = loaded.get()
+            if item is _DONE:
+                finished_readers += 1
+                continue
+            path, name, inputs, error = item
+            if error is not None:
+                failed += 1
+                emit([{"path": path, "model": name, "score": None, "error": error}])
+                continue
+            pending.setdefault(name, []).append((path, inputs))
+            if sum(len(x) for _, x in pending[name]) >= batch_size:
+                flush(name)
+
+        for name in list(pending.keys()):
+            flush(name)
+    finally:
+        written.put(_DONE)
+        writer_thread.join()
+    if write_errors:
+        raise write_errors[0]
+
+    elapsed = time.perf_counter() - start_time
+    print(f" Scored {scored} file(s), {failed} failed in {elapsed:.1f}s "
+          f"({scored / max(elapsed, 1e-9):.1f} files/s) -> {output_path}")
+    return scored, failed
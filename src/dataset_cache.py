@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Preprocessed training tensors stored as memory-mappable .npy files:
+#   <cache_dir>/images.npy    (N, H, W) preprocessed tiles
+#   <cache_dir>/labels.npy    (N,) labels
+#   <cache_dir>/manifest.json source file fingerprints (size, mtime, sha256) -> row index
+# Rebuilding re-processes only the sources whose content hash changed.
+
+
+# Streaming SHA-256 of a file
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Size/mtime/hash of a source; the hash is reused when size and mtime are unchanged
+def file_fingerprint(path, previous=None):
+    stat = os.stat(path)
+    if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": previous["sha256"]}
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(path)}
+
+
+def _load_manifest(manifest_path):
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f" Ignoring unreadable dataset manifest {manifest_path}: {e}")
+    return None
+
+
+# Atomic write, so a crash never leaves a truncated manifest
+def _save_manifest(manifest_path, manifest):
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+# Build or refresh the cache for every `extension` file in folder.
+# preprocess_fn(path) -> array of `shape`; label_fn(filename) -> label.
+# `version` identifies the preprocessing; changing it invalidates every entry.
+def build_dataset_cache(folder, cache_dir, preprocess_fn, label_fn, shape, dtype=np.float32,
+                        version="1", extension=".tif"):
+    os.makedirs(cache_dir, exist_ok=True)
+    images_path = os.path.join(cache_dir, "images.npy")
+    labels_path = os.path.join(cache_dir, "labels.npy")
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+
+    dtype = np.dtype(dtype)
+    shape = tuple(shape)
+    filenames = sorted(name for name in os.listdir(folder) if name.endswith(extension))
+
+    manifest = _load_manifest(manifest_path)
+    old_files = {}
+    old_images = None
+    if (manifest and manifest.get("version") == version and tuple(manifest.get("shape", ())) == shape
+            and manifest.get("dtype") == dtype.str and os.path.exists(images_path)):
+        old_files = manifest["files"]
+        old_images = np.load(images_path, mmap_mode="r")
+
+    fingerprints = {name: file_fingerprint(os.path.join(folder, name), old_files.get(name)) for name in filenames}
+    unchanged = [name for name in filenames
+                 if name in old_files and old_files[name]["sha256"] == fingerprints[name]["sha256"]]
+
+    if old_images is not None and len(unchanged) == len(filenames) == len(old_files):
+        print(f" Dataset cache up to date: {cache_dir} ({len(filenames)} entries)")
+        del old_images
+        # Touched but unchanged files: store the new size/mtime so they are not re-hashed next run
+        refreshed = {name: dict(fingerprints[name], index=old_files[name]["index"]) for name in filenames}
+        if refreshed != old_files:
+            _save_manifest(manifest_path, dict(manifest, files=refreshed))
+        return load_dataset_cache(cache_dir)
+
+    tmp_images_path = os.path.join(cache_dir, "images.tmp.npy")
+    images = np.lib.format.open_memmap(tmp_images_path, mode="w+", dtype=dtype, shape=(len(filenames),) + shape)
+    labels = np.empty(len(filenames), dtype=np.int64)
+
+    rebuilt = 0
+    files = {}
+    unchanged = set(unchanged)
+    for index, name in enumerate(filenames):
+        if name in unchanged:
+            images[index] = old_images[old_files[name]["index"]]
+        else:
+            images[index] = preprocess_fn(os.path.join(folder, name))
+            rebuilt += 1
+        labels[index] = label_fn(name)
+        files[name] = dict(fingerprints[name], index=index)
+
+    images.flush()
+    del images, old_images
+    # The old manifest's row indices describe the old images file: drop it before replacing the
+    # images, so a crash in between leaves a cache that is rebuilt rather than silently misread
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    os.replace(tmp_images_path, images_path)
+    np.save(labels_path, labels)
+    _save_manifest(manifest_path, {"version": version, "shape": list(shape), "dtype": dtype.str, "files": files})
+
+    print(f" Dataset cache built: {cache_dir} ({rebuilt} processed, {len(filenames) - rebuilt} reused)")
+    return load_dataset_cache(cache_dir)
+
+
+# Memory-map a built cache: (images, labels)
+def load_dataset_cache(cache_dir):
+    images = np.load(os.path.join(cache_dir, "images.npy"), mmap_mode="r")
+    labels = np.load(os.path.join(cache_dir, "labels.npy"))
+    return images, labels
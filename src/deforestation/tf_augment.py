@@ -0,0 +1,90 @@
+import math
+import tensorflow as tf
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+# Same augmentation ranges the deforestation training used with ImageDataGenerator
+AUGMENTATION = {
+    "rotation_range": 40,         # degrees, +/-
+    "width_shift_range": 0.3,     # fraction of width, +/-
+    "height_shift_range": 0.3,    # fraction of height, +/-
+    "brightness_range": (0.6, 1.4),
+    "zoom_range": 0.3,            # zoom factor in [1 - z, 1 + z], per axis
+    "horizontal_flip": True,
+}
+
+
+# Per-image affine transforms (rotation, shift, zoom about the centre) for a whole batch,
+# in the 8-parameter form expected by ImageProjectiveTransform (output -> input mapping)
+def random_affine_transforms(batch_size, height, width, config):
+    height = tf.cast(height, tf.float32)
+    width = tf.cast(width, tf.float32)
+
+    theta = tf.random.uniform([batch_size], -1.0, 1.0) * config["rotation_range"] * math.pi / 180.0
+    tx = tf.random.uniform([batch_size], -1.0, 1.0) * config["width_shift_range"] * width
+    ty = tf.random.uniform([batch_size], -1.0, 1.0) * config["height_shift_range"] * height
+    zx = tf.random.uniform([batch_size], 1.0 - config["zoom_range"], 1.0 + config["zoom_range"])
+    zy = tf.random.uniform([batch_size], 1.0 - config["zoom_range"], 1.0 + config["zoom_range"])
+
+    cx = (width - 1.0) / 2.0
+    cy = (height - 1.0) / 2.0
+    cos, sin = tf.cos(theta), tf.sin(theta)
+
+    a0 = zx * cos
+    a1 = -zy * sin
+    b0 = zx * sin
+    b1 = zy * cos
+    a2 = cx - a0 * cx - a1 * cy + tx
+    b2 = cy - b0 * cx - b1 * cy + ty
+    zeros = tf.zeros([batch_size])
+    return tf.stack([a0, a1, a2, b0, b1, b2, zeros, zeros], axis=1)
+
+
+# Augment a whole (B, H, W, C) float32 batch in one set of vectorized ops
+def augment_batch(images, labels, config=AUGMENTATION):
+    shape = tf.shape(images)
+    batch_size, height, width = shape[0], shape[1], shape[2]
+
+    transforms = random_affine_transforms(batch_size, height, width, config)
+    images = tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=transforms,
+        output_shape=tf.stack([height, width]),
+        fill_value=0.0,
+        interpolation="BILINEAR",
+        fill_mode="NEAREST",
+    )
+
+    low, high = config["brightness_range"]
+    brightness = tf.random.uniform([batch_size, 1, 1, 1], low, high)
+    images = tf.clip_by_value(images * brightness, 0.0, 255.0)
+
+    if config["horizontal_flip"]:
+        flip = tf.random.uniform([batch_size, 1, 1, 1]) < 0.5
+        images = tf.where(flip, tf.reverse(images, axis=[2]), images)
+
+    return images, labels
+
+
+def _to_float(images, labels):
+    return tf.cast(images, tf.float32), labels
+
+
+# Shuffled, batched, augmented training pipeline. `cache` may be True (in memory) or a file path.
+def make_train_dataset(X, y, batch_size=32, shuffle=True, cache=False, config=AUGMENTATION):
+    ds = tf.data.Dataset.from_tensor_slices((X, y)).map(_to_float, num_parallel_calls=AUTOTUNE)
+    if cache:
+        ds = ds.cache(cache if isinstance(cache, str) else "")
+    if shuffle:
+        ds = ds.shuffle(len(X), reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+    ds = ds.map(lambda images, labels: augment_batch(images, labels, config), num_parallel_calls=AUTOTUNE)
+    return ds.prefetch(AUTOTUNE)
+
+
+# Un-augmented evaluation pipeline
+def make_eval_dataset(X, y, batch_size=32, cache=False):
+    ds = tf.data.Dataset.from_tensor_slices((X, y)).map(_to_float, num_parallel_calls=AUTOTUNE)
+    if cache:
+        ds = ds.cache(cache if isinstance(cache, str) else "")
+    return ds.batch(batch_size).prefetch(AUTOTUNE)
@@ -1,35 +1,41 @@
 import numpy as np
-import rasterio
 import os
+import sys
 import cv2
 import tensorflow as tf
 from tensorflow.keras import layers, models, callbacks
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from raster_io import read_band_with_stats
+from dataset_cache import build_dataset_cache
+from tf_augment import make_train_dataset, make_eval_dataset
 
 #  Define Image Size & Paths
 IMG_SIZE = (128, 128)
 TRAIN_PATH = "data/deforestation/train"
 TEST_PATH = "data/deforestation/test"
+CACHE_DIR = "data/deforestation/cache"
+CACHE_VERSION = "clahe-hist-128-v1"  # Bump when preprocess_tile changes
 # MODEL_PATH = "models/deforestation_model.h5"
 
-# Function to Load & Process TIFF Images (with Contrast Stretching)
+# Function to Load & Process one TIFF Image (with Contrast Stretching)
+def preprocess_tile(file_path):
+    # Read straight at IMG_SIZE; min/max come from a streaming pass over the full tile
+    image, stats = read_band_with_stats(file_path, out_shape=IMG_SIZE)
+    image_resized = (image - stats["min"]) / (stats["max"] - stats["min"] + 1e-7)  # Normalize (0-1)
+
+    # Apply Contrast Stretching
+    image_rescaled = (image_resized * 255).astype(np.uint8)  # Convert to 8-bit
+    return cv2.equalizeHist(image_rescaled)  # Apply histogram equalization
+
+def label_for(filename):
+    return 1 if "deforested" in filename else 0  # Assign label
+
+# Load a folder through the preprocessed tensor cache (only new/changed tiles are decoded)
 def load_tiff_images(folder):
-    images, labels = [], []
-    for filename in os.listdir(folder):
-        if filename.endswith(".tif"):  # Process only TIFF images
-            file_path = os.path.join(folder, filename)
-            with rasterio.open(file_path) as dataset:
-                image = dataset.read(1)  # Read as grayscale
-                image = (image - image.min()) / (image.max() - image.min() + 1e-7)  # Normalize (0-1)
-                image_resized = cv2.resize(image, IMG_SIZE)  # Resize properly
-                
-                # Apply Contrast Stretching
-                image_rescaled = (image_resized * 255).astype(np.uint8)  # Convert to 8-bit
-                image_contrast = cv2.equalizeHist(image_rescaled)  # Apply histogram equalization
-                
-                images.append(image_contrast)
-                labels.append(1 if "deforested" in filename else 0)  # Assign label
-    return np.array(images), np.array(labels)
+    cache_dir = os.path.join(CACHE_DIR, os.path.basename(os.path.normpath(folder)))
+    return build_dataset_cache(folder, cache_dir, preprocess_tile, label_for, IMG_SIZE,
+                               dtype=np.uint8, version=CACHE_VERSION)
 
 # Load Training & Testing Data
 X_train, y_train = load_tiff_images(TRAIN_PATH)
@@ -39,16 +45,9 @@ X_test, y_test = load_tiff_images(TEST_PATH)
 X_train = X_train.reshape(-1, IMG_SIZE[0], IMG_SIZE[1], 1)
 X_test = X_test.reshape(-1, IMG_SIZE[0], IMG_SIZE[1], 1)
 
-#  Enhanced Data Augmentation
-datagen = ImageDataGenerator(
-    rotation_range=40,
-    width_shift_range=0.3,
-    height_shift_range=0.3,
-    brightness_range=[0.6, 1.4],
-    zoom_range=0.3,
-    horizontal_flip=True
-)
-train_generator = datagen.flow(X_train, y_train, batch_size=32, shuffle=True)
+#  Enhanced Data Augmentation (tf.data: batched, vectorized and prefetched; see tf_augment.AUGMENTATION)
+train_dataset = make_train_dataset(X_train, y_train, batch_size=32, shuffle=True, cache=True)
+val_dataset = make_eval_dataset(X_test, y_test, batch_size=32, cache=True)
 
 # CNN Model for Deforestation Detection
 model = models.Sequential([
@@ -84,8 +83,8 @@ checkpoint = callbacks.ModelCheckpoint("models/best_model.keras", save_best_only
 
 # Train Model with Augmented Data & Callbacks
 history = model.fit(
-    train_generator, epochs=300,
-    validation_data=(X_test, y_test),
+    train_dataset, epochs=300,
+    validation_data=val_dataset,
     callbacks=[lr_callback, early_stopping, checkpoint]
 )
 
@@ -1,8 +1,10 @@
 import os
-import rasterio
-import numpy as np
+import sys
 import cv2
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from raster_io import read_band_with_stats, to_uint8
+
 # Define input & output directories for deforestation
 dataset = {
     "train": "data/deforestation/train",
@@ -15,20 +17,18 @@ os.makedirs(dataset["output"], exist_ok=True)
 
 # Function to convert .tif to .jpg with brightness adjustment
 def convert_tif_to_jpg(tif_path, jpg_path):
-    with rasterio.open(tif_path) as dataset:
-        image = dataset.read(1)  # Read single-band NDVI
+    image, stats = read_band_with_stats(tif_path)  # Read single-band NDVI as float32
 
-        # **Fix: Normalize between 0-255**
-        image = (image - image.min()) / (image.max() - image.min() + 1e-7) * 255
-        image = image.astype(np.uint8)  # Convert to 8-bit grayscale
+    # **Fix: Normalize between 0-255**
+    image = to_uint8(image, stats)  # Convert to 8-bit grayscale
 
-        # **Apply CLAHE (Adaptive Histogram Equalization)**
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-        image = clahe.apply(image)
+    # **Apply CLAHE (Adaptive Histogram Equalization)**
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+    image = clahe.apply(image)
 
-        # Save as JPG
-        cv2.imwrite(jpg_path, image)
-        print(f"✅ Converted: {jpg_path}")
+    # Save as JPG
+    cv2.imwrite(jpg_path, image)
+    print(f"✅ Converted: {jpg_path}")
 
 # Process images for deforestation dataset (train & test)
 for data_type in ["train", "test"]:
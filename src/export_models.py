@@ -0,0 +1,92 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from model_registry import ModelRegistry, MODEL_SPECS, MODELS_DIR
+from inference_backends import TFLiteModel
+
+# Export the trained Keras models to TFLite for the lightweight "tflite" inference backend
+# and check that the exported models agree with Keras on random inputs.
+
+DEFAULT_ATOL = 1e-4
+SAMPLE_BATCH = 8
+# Batch size baked into models (the LSTMs) whose loops cannot be lowered with a dynamic batch
+FIXED_BATCH = 32
+
+
+# Convert one Keras model to a TFLite flatbuffer using builtin ops only (no Flex/TensorFlow
+# dependency at inference time). Recurrent models fall back to a fixed batch size, which
+# TFLiteModel handles by chunking and padding; their time axis stays dynamic so sequences of any
+# length can be scored, as with Keras.
+def convert_to_tflite(model):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    try:
+        return converter.convert()
+    except Exception as e:
+        print(f" Dynamic-batch conversion failed ({type(e).__name__}); exporting with batch size {FIXED_BATCH}")
+
+    input_shape = tuple(model.input_shape[1:])
+    if len(input_shape) == 2:
+        input_shape = (None,) + input_shape[1:]  # (steps, features): leave the steps dynamic
+    fixed_model = tf.keras.models.clone_model(
+        model, input_tensors=tf.keras.Input(batch_shape=(FIXED_BATCH,) + input_shape)
+    )
+    fixed_model.set_weights(model.get_weights())
+    converter = tf.lite.TFLiteConverter.from_keras_model(fixed_model)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    return converter.convert()
+
+
+# Random inputs shaped like the model's input (batch axis filled with SAMPLE_BATCH)
+def sample_inputs(model, batch=SAMPLE_BATCH, seed=0):
+    shape = [batch] + [dim or 1 for dim in model.input_shape[1:]]
+    return np.random.default_rng(seed).random(shape, dtype=np.float32)
+
+
+# Export one registry model; returns (tflite_path, max_abs_diff)
+def export_model(name, registry, atol=DEFAULT_ATOL):
+    keras_model = registry.get(name)
+    tflite_path = registry.path_for(name, backend="tflite")
+
+    with open(tflite_path, "wb") as f:
+        f.write(convert_to_tflite(keras_model))
+
+    x = sample_inputs(keras_model)
+    expected = np.asarray(keras_model.predict_on_batch(x))
+    actual = TFLiteModel(tflite_path).predict_on_batch(x)
+    max_diff = float(np.max(np.abs(expected - actual)))
+
+    status = "✅" if max_diff <= atol else "⚠️"
+    size_kb = os.path.getsize(tflite_path) / 1024
+    print(f"{status} {name}: {tflite_path} ({size_kb:.0f} KB), max |keras - tflite| = {max_diff:.2e}")
+    return tflite_path, max_diff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export trained Keras models to TFLite.")
+    parser.add_argument("--models", nargs="+", default=list(MODEL_SPECS.keys()), choices=list(MODEL_SPECS.keys()),
+                        help="Models to export (default: all)")
+    parser.add_argument("--models-dir", type=str, default=MODELS_DIR, help="Folder holding the .h5 models")
+    parser.add_argument("--atol", type=float, default=DEFAULT_ATOL, help="Max allowed |keras - tflite| difference")
+
+    args = parser.parse_args()
+    registry = ModelRegistry(args.models_dir, backend="keras", tflite_variant=None)
+
+    start_time = time.perf_counter()
+    failed = []
+    for name in args.models:
+        if not os.path.exists(registry.path_for(name)):
+            print(f" Skipping {name}: {registry.path_for(name)} not found")
+            continue
+        _, max_diff = export_model(name, registry, atol=args.atol)
+        if max_diff > args.atol:
+            failed.append(name)
+
+    print(f" Export finished in {time.perf_counter() - start_time:.1f}s")
+    if failed:
+        raise SystemExit(f" Outputs differ beyond tolerance for: {failed}")
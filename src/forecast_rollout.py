@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+# Batched autoregressive rollout for sequence models that predict the next row of their own input.
+# Every (scenario, sequence) pair advances together: one model call per step over the whole batch.
+# Histories live in one (batch, time_steps + horizon, features) buffer; each step reads the last
+# time_steps rows as a view and writes its prediction into the next row, so nothing is rolled or copied.
+
+BASELINE = "baseline"
+
+
+# Per-feature multiplicative adjustment applied to each step's prediction, shape (scenarios, features)
+def scenario_factors(scenarios, feature_columns):
+    factors = np.ones((len(scenarios), len(feature_columns)), dtype=np.float32)
+    for i, adjustments in enumerate(scenarios.values()):
+        for column, factor in adjustments.items():
+            factors[i, feature_columns.index(column)] = factor
+    return factors
+
+
+# Roll every initial window forward `horizon` steps under every scenario.
+# windows: (sequences, time_steps, features); scenarios: {name: {feature: factor}} (empty = no change).
+# Returns forecasts of shape (scenarios, sequences, horizon, features).
+def rollout(model, windows, horizon, feature_columns, scenarios=None, batch_size=4096):
+    scenarios = scenarios or {BASELINE: {}}
+    windows = np.asarray(windows, dtype=np.float32)
+    sequences, time_steps, n_features = windows.shape
+
+    history = np.empty((len(scenarios) * sequences, time_steps + horizon, n_features), dtype=np.float32)
+    history[:, :time_steps] = np.tile(windows, (len(scenarios), 1, 1))
+    factors = np.repeat(scenario_factors(scenarios, list(feature_columns)), sequences, axis=0)
+
+    for step in range(horizon):
+        inputs = history[:, step:step + time_steps]
+        for start in range(0, len(history), batch_size):
+            stop = start + batch_size
+            prediction = np.asarray(model(inputs[start:stop], training=False))
+            history[start:stop, time_steps + step] = prediction * factors[start:stop]
+
+    return history[:, time_steps:].reshape(len(scenarios), sequences, horizon, n_features)
+
+
+# Columnar (long) table: one row per scenario, sequence and step
+def forecasts_to_frame(forecasts, scenario_names, sequence_labels, feature_columns, label_column="group"):
+    n_scenarios, n_sequences, horizon, _ = forecasts.shape
+    frame = pd.DataFrame({
+        "scenario": pd.Categorical(np.repeat(list(scenario_names), n_sequences * horizon), categories=list(scenario_names)),
+        label_column: np.tile(np.repeat(np.asarray(sequence_labels), horizon), n_scenarios),
+        "year": np.tile(np.arange(1, horizon + 1, dtype=np.int16), n_scenarios * n_sequences),
+    })
+    values = forecasts.reshape(-1, forecasts.shape[-1])
+    for i, column in enumerate(feature_columns):
+        frame[column] = values[:, i]
+    return frame
+
+
+# Parquet when the path asks for it (needs pyarrow), CSV otherwise
+def save_forecasts(frame, path):
+    if path.lower().endswith(".parquet"):
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
@@ -0,0 +1,95 @@
+import numpy as np
+
+# Lightweight CPU inference for exported models (see export_models.py).
+# Prefers the standalone TFLite interpreter packages, which avoid importing TensorFlow;
+# falls back to tf.lite when only full TensorFlow is installed.
+
+
+def _interpreter_class():
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+# TFLite model exposing the subset of the Keras API our scripts use (predict / predict_on_batch)
+class TFLiteModel:
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = _interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._input_shape = tuple(self._input["shape"])
+        # Models exported with a baked-in batch size (see export_models.FIXED_BATCH)
+        batch_dim = self._input["shape_signature"][0]
+        self.fixed_batch = int(batch_dim) if batch_dim > 0 and batch_dim != 1 else None
+
+    @property
+    def input_shape(self):
+        return (None,) + self._input_shape[1:]
+
+    # Resize the interpreter for a new input shape (only when it changes)
+    def _prepare(self, shape):
+        if shape != self._input_shape:
+            self.interpreter.resize_tensor_input(self._input["index"], shape, strict=False)
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._input_shape = shape
+
+    # Full-integer models take and return int8/uint8 tensors; (de)quantize at the boundary
+    def _invoke(self, x):
+        scale, zero_point = self._input["quantization"]
+        if np.issubdtype(self._input["dtype"], np.integer) and scale:
+            info = np.iinfo(self._input["dtype"])
+            x = np.clip(np.round(x / scale + zero_point), info.min, info.max)
+        self.interpreter.set_tensor(self._input["index"], x.astype(self._input["dtype"], copy=False))
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self._output["index"])
+
+        scale, zero_point = self._output["quantization"]
+        if np.issubdtype(self._output["dtype"], np.integer) and scale:
+            return (output.astype(np.float32) - zero_point) * scale
+        return output.copy()
+
+    # One invocation over the whole batch (fixed-batch models: one per padded chunk)
+    def predict_on_batch(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        # Keras adds a trailing feature axis for (batch, steps) inputs to sequence models; mirror that
+        if x.ndim == len(self._input_shape) - 1:
+            x = x[..., np.newaxis]
+
+        if self.fixed_batch is None:
+            self._prepare(tuple(x.shape))
+            return self._invoke(x)
+
+        # The batch axis is baked in; other axes (e.g. the number of time steps) may vary only where
+        # the export left them dynamic
+        signature = self._input["shape_signature"]
+        for axis, (expected, got) in enumerate(zip(signature[1:], x.shape[1:]), start=1):
+            if expected > 0 and expected != got:
+                raise ValueError(f"{self.model_path} was exported for axis {axis} = {expected} (got {got}); "
+                                 f"re-run export_models.py to export it with a dynamic time axis")
+        self._prepare((self.fixed_batch,) + tuple(x.shape[1:]))
+        outputs = []
+        for start in range(0, len(x), self.fixed_batch):
+            chunk = x[start:start + self.fixed_batch]
+            padded = np.zeros((self.fixed_batch,) + chunk.shape[1:], dtype=chunk.dtype)
+            padded[:len(chunk)] = chunk
+            outputs.append(self._invoke(padded)[:len(chunk)])
+        return np.concatenate(outputs)
+
+    def predict(self, x, batch_size=None, verbose=0):
+        x = np.asarray(x)
+        if batch_size is None or len(x) <= batch_size:
+            return self.predict_on_batch(x)
+        return np.concatenate([self.predict_on_batch(x[i:i + batch_size]) for i in range(0, len(x), batch_size)])
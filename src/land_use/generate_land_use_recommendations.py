@@ -1,60 +1,102 @@
 import pandas as pd
 import numpy as np
+import operator
 import os
+import sys
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from land_use_data import iter_land_use, load_land_use, LAND_USE_EXACT_DTYPES
 
 # Ensure data directory exists
 data_path = "data/land_use/"
-os.makedirs(data_path, exist_ok=True)
 
 # Load the dataset
 csv_file = os.path.join(data_path, "organization_land_use.csv")
 output_file = os.path.join(data_path, "land_use_recommendations.csv")
 
-if not os.path.exists(csv_file):
-    print(f" Error: {csv_file} not found! Please ensure the dataset is in the correct location.")
-    exit()
-
-df = pd.read_csv(csv_file)
-
-# Define recommendation rules
-def recommend_land_use(row):
-    land_type = row["land_type"]
-    biodiversity_index = row["biodiversity_index"]
-    carbon_sequestration = row["carbon_sequestration"]
-    economic_value = row["economic_value"]
-
-    recommendations = []
+NO_RECOMMENDATION = "No Specific Recommendation"
 
+# Recommendation rules: (column, condition, threshold, recommendation).
+# Rule i sets bit i of the recommendation mask; rules are listed in output order.
+RULES = [
     # Rule 1: High biodiversity areas should be conserved
-    if biodiversity_index > 0.8:
-        recommendations.append("Conservation & Protection Initiatives")
-    
+    ("biodiversity_index", ">", 0.8, "Conservation & Protection Initiatives"),
     # Rule 2: Urban areas should have more green spaces
-    if land_type == "Urban":
-        recommendations.append("Green Infrastructure Development (Parks, Rooftop Gardens)")
-    
+    ("land_type", "==", "Urban", "Green Infrastructure Development (Parks, Rooftop Gardens)"),
     # Rule 3: Low biodiversity areas should be restored
-    if biodiversity_index < 0.4:
-        recommendations.append("Reforestation or Wetland Restoration")
-    
+    ("biodiversity_index", "<", 0.4, "Reforestation or Wetland Restoration"),
     # Rule 4: High carbon sequestration lands should be protected
-    if carbon_sequestration > 50:
-        recommendations.append("Forest & Carbon Offset Protection Programs")
-
+    ("carbon_sequestration", ">", 50, "Forest & Carbon Offset Protection Programs"),
     # Rule 5: Low carbon sequestration areas should implement carbon offsetting
-    if carbon_sequestration < 10:
-        recommendations.append("Adopt Carbon Offset Programs (Afforestation, Biochar)")
-    
+    ("carbon_sequestration", "<", 10, "Adopt Carbon Offset Programs (Afforestation, Biochar)"),
     # Rule 6: If economic value is high, balance sustainability with economic incentives
-    if economic_value > 100000:
-        recommendations.append("Sustainable Agriculture & Eco-Tourism Development")
+    ("economic_value", ">", 100000, "Sustainable Agriculture & Eco-Tourism Development"),
+]
+
+CONDITIONS = {">": operator.gt, "<": operator.lt, ">=": operator.ge, "<=": operator.le, "==": operator.eq}
+
+# Evaluate every rule as a boolean mask over the columns and pack the hits into one bitmask per row
+def recommendation_masks(df, rules=RULES):
+    dtype = np.uint8 if len(rules) <= 8 else np.uint32
+    masks = np.zeros(len(df), dtype=dtype)
+    for bit, (column, condition, threshold, _) in enumerate(rules):
+        values = df[column]
+        if pd.api.types.is_float_dtype(values.dtype):
+            # Compare at the column's precision so float32 values equal to a threshold stay equal
+            threshold = values.dtype.type(threshold)
+        hits = CONDITIONS[condition](values.to_numpy(), threshold)
+        masks |= hits.astype(dtype) << bit
+    return masks
+
+# "; "-joined recommendation text for a bitmask
+def describe_mask(mask, rules=RULES):
+    texts = [rule[3] for bit, rule in enumerate(rules) if mask >> bit & 1]
+    return "; ".join(texts) if texts else NO_RECOMMENDATION
+
+# Recommendation text as a categorical column: each distinct bitmask is described once
+def recommendation_labels(masks, rules=RULES):
+    unique_masks, codes = np.unique(masks, return_inverse=True)
+    categories = [describe_mask(int(mask), rules) for mask in unique_masks]
+    return pd.Categorical.from_codes(codes.reshape(-1), categories)
+
+# Add the recommendation columns to a land-use frame
+def recommend_land_use(df, text=True, rules=RULES):
+    masks = recommendation_masks(df, rules)
+    df["recommendation_mask"] = masks
+    if text:
+        df["recommendations"] = recommendation_labels(masks, rules)
+    return df
+
+def generate_recommendations(input_file=csv_file, output=output_file, chunksize=None, text=True, use_cache=True):
+    if not os.path.exists(input_file):
+        print(f" Error: {input_file} not found! Please ensure the dataset is in the correct location.")
+        return
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
 
-    return "; ".join(recommendations) if recommendations else "No Specific Recommendation"
+    # Whole file at once, or fixed-size chunks appended to the output for inputs larger than memory.
+    # Metrics are written back out, so they are read at full (float64) precision.
+    if chunksize is None:
+        chunks = [load_land_use(input_file, use_cache=use_cache, dtypes=LAND_USE_EXACT_DTYPES)]
+    else:
+        chunks = iter_land_use(input_file, chunksize, use_cache=use_cache, dtypes=LAND_USE_EXACT_DTYPES)
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        recommend_land_use(chunk, text=text).to_csv(output, index=False, mode="w" if i == 0 else "a", header=i == 0)
+        rows += len(chunk)
 
-# Apply recommendations to the dataset
-df["recommendations"] = df.apply(recommend_land_use, axis=1)
+    # Save the recommendations to a new CSV file
+    print(f" Sustainable Land-Use Recommendations Generated for {rows} parcels and saved at: {output}")
 
-# Save the recommendations to a new CSV file
-df.to_csv(output_file, index=False)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate land-use recommendations from rule thresholds.")
+    parser.add_argument("--input", type=str, default=csv_file)
+    parser.add_argument("--output", type=str, default=output_file)
+    parser.add_argument("--chunksize", type=int, default=None, help="Stream the CSV in chunks of this many rows")
+    parser.add_argument("--mask-only", action="store_true",
+                        help="Only write the compact recommendation_mask column (bit i = rule i in RULES)")
+    parser.add_argument("--no-cache", action="store_true", help="Read the CSV directly instead of the Parquet cache")
 
-print(f" Sustainable Land-Use Recommendations Generated and saved at: {output_file}")
+    args = parser.parse_args()
+    generate_recommendations(args.input, args.output, args.chunksize, text=not args.mask_only, use_cache=not args.no_cache)
@@ -1,9 +1,13 @@
 import pandas as pd
-import numpy as np
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from time_windows import make_windows, last_windows
+from forecast_rollout import rollout, forecasts_to_frame, save_forecasts
 
 # Load Data
 data_path = "data/land_use/land_use_recommendations.csv"
@@ -17,13 +21,23 @@ df = pd.read_csv(data_path)
 features = ["biodiversity_index", "carbon_sequestration", "economic_value"]
 target = ["biodiversity_index", "carbon_sequestration", "economic_value"]  # Predict same metrics in the future
 
+# Set to e.g. "company" to build each organization's windows (and forecast) from its own history only
+group_column = None
+
+# Forecast horizon (years) and scenarios: per-year multiplicative adjustments of the model's
+# (scaled) predictions; "baseline" leaves them unchanged
+horizon = 10
+scenarios = {
+    "baseline": {},
+    "conservation": {"biodiversity_index": 1.02, "carbon_sequestration": 1.02},
+    "development": {"biodiversity_index": 0.98, "economic_value": 1.03},
+}
+forecasts_path = "data/land_use/long_term_forecasts.csv"  # .parquet also supported
+
 # Prepare Time-Series Data (Simulating 10 Years Future Impact)
-def create_time_series(df, feature_columns, target_columns, time_steps=5):
-    X, y = [], []
-    for i in range(len(df) - time_steps):
-        X.append(df[feature_columns].iloc[i: i + time_steps].values)
-        y.append(df[target_columns].iloc[i + time_steps].values)
-    return np.array(X), np.array(y)
+# Windows are strided views over the feature matrix, not per-row slices
+def create_time_series(df, feature_columns, target_columns, time_steps=5, group_column=None):
+    return make_windows(df, feature_columns, target_columns, time_steps, group_column=group_column)
 
 # Normalize Data (Scaling Between 0-1)
 from sklearn.preprocessing import MinMaxScaler
@@ -34,7 +48,7 @@ for col in features:
 
 # Generate Training Data
 time_steps = 5  # Use past 5 records to predict the next year
-X, y = create_time_series(df, features, target, time_steps)
+X, y = create_time_series(df, features, target, time_steps, group_column)
 
 # Split into Train & Test Sets (80-20 Split)
 split_index = int(len(X) * 0.8)
@@ -60,23 +74,29 @@ model.fit(X_train, y_train, epochs=50, batch_size=16, validation_data=(X_test, y
 model.save("models/long_term_impact_model.h5")
 print(" AI Model Trained & Saved for Long-Term Impact Prediction")
 
-# **Future Simulation: Predict Next 10 Years**
-future_predictions = []
-current_input = X[-1]  # Last known data
+# **Future Simulation: Roll Every Sequence Forward Under Every Scenario**
+# One batched model call per year advances all (scenario, organization) trajectories together.
+# Each rollout is seeded with the last time_steps rows of history. The original script seeded it
+# with X[-1], the last training window, which stops one row short of the newest record (that row
+# was only ever a target).
+labels, windows = last_windows(df, features, time_steps, group_column)
+if not labels:
+    print(f" Error: no history with at least {time_steps} records to forecast from.")
+    exit()
+forecasts = rollout(model, windows, horizon, features, scenarios)
 
-for _ in range(10):  # Predict for 10 years
-    future_prediction = model.predict(current_input.reshape(1, time_steps, len(features)))
-    future_predictions.append(future_prediction[0])
-    
-    # Shift Input & Append New Prediction
-    current_input = np.roll(current_input, -1, axis=0)
-    current_input[-1] = future_prediction[0]  # Replace last row with new prediction
+# Convert Predictions Back to Original Scale
+for i, col in enumerate(target):
+    forecasts[..., i] = scalers[col].inverse_transform(forecasts[..., i].reshape(-1, 1)).reshape(forecasts.shape[:-1])
 
-# Convert Predictions to DataFrame
-future_df = pd.DataFrame(future_predictions, columns=target)
-for col in target:
-    future_df[col] = scalers[col].inverse_transform(future_df[[col]])  # Convert Back to Original Scale
+# Save Forecasts in Columnar Form (scenario, organization, year, metrics)
+label_column = group_column or "group"
+forecast_df = forecasts_to_frame(forecasts, scenarios.keys(), [label if label is not None else "all" for label in labels],
+                                 target, label_column)
+save_forecasts(forecast_df, forecasts_path)
+print(f" Forecasts ({len(scenarios)} scenarios x {len(labels)} sequences x {horizon} years) Saved at: {forecasts_path}")
 
-# Save Future Predictions
+# Baseline trajectory of the first sequence, in the layout visualize_long_term_impact.py plots
+future_df = pd.DataFrame(forecasts[0, 0], columns=target)
 future_df.to_csv("data/land_use/long_term_predictions.csv", index=False)
-print(" Future Predictions (Next 10 Years) Saved at: data/land_use/long_term_predictions.csv")
+print(f" Future Predictions (Next {horizon} Years) Saved at: data/land_use/long_term_predictions.csv")
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from dataset_cache import file_fingerprint
+
+# Shared loader for organization_land_use.csv and files with the same columns.
+# Columns are read with compact dtypes (categorical land_type, float32 metrics), optionally chunk by
+# chunk, and a Parquet copy is cached under data/land_use/cache, rebuilt only when the CSV changes.
+# Parquet support is optional (pyarrow); without it the CSV is read directly.
+
+LAND_USE_CSV = "data/land_use/organization_land_use.csv"
+CACHE_DIR = "data/land_use/cache"
+CHUNKSIZE = 100_000
+
+LAND_USE_DTYPES = {
+    "land_type": "category",
+    "land_area": "float32",
+    "biodiversity_index": "float32",
+    "carbon_sequestration": "float32",
+    "economic_value": "float32",
+}
+
+# Full-precision variant for outputs that echo the metrics back
+LAND_USE_EXACT_DTYPES = {
+    column: "category" if dtype == "category" else "float64" for column, dtype in LAND_USE_DTYPES.items()
+}
+
+# Bump when LAND_USE_DTYPES or the cache layout changes
+CACHE_VERSION = "1"
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        return pa, pq
+    except ImportError:
+        return None
+
+
+def read_columns(csv_path):
+    return list(pd.read_csv(csv_path, nrows=0).columns)
+
+
+# One Parquet copy per dtype set; the default LAND_USE_DTYPES copy keeps the plain <stem>.parquet name
+def parquet_cache_path(csv_path, cache_dir=CACHE_DIR, dtypes=LAND_USE_DTYPES):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    if dtypes != LAND_USE_DTYPES:
+        stem += "_" + hashlib.sha256(json.dumps(dtypes, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(cache_dir, f"{stem}.parquet")
+
+
+def _load_manifest(manifest_path):
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f" Ignoring unreadable land-use cache manifest {manifest_path}: {e}")
+    return None
+
+
+# Integer columns (inferred from one chunk) become float64, so a later chunk with a fraction or a
+# blank still has the same dtype
+def _promote_integers(chunk):
+    integer_columns = [column for column in chunk.columns
+                       if pd.api.types.is_integer_dtype(chunk[column].dtype)
+                       or pd.api.types.is_bool_dtype(chunk[column].dtype)]
+    if integer_columns:
+        chunk = chunk.astype({column: "float64" for column in integer_columns})
+    return chunk
+
+
+def _iter_csv(csv_path, chunksize, columns, dtypes=LAND_USE_DTYPES):
+    for chunk in pd.read_csv(csv_path, dtype=dtypes, usecols=columns, chunksize=chunksize):
+        yield _promote_integers(chunk)
+
+
+# Parquet copy of the CSV, converted chunk by chunk; reused while the CSV fingerprint is unchanged.
+# Returns None when pyarrow is not installed.
+def build_parquet_cache(csv_path, cache_dir=CACHE_DIR, chunksize=CHUNKSIZE, dtypes=LAND_USE_DTYPES):
+    arrow = _pyarrow()
+    if arrow is None:
+        return None
+    pa, pq = arrow
+
+    parquet_path = parquet_cache_path(csv_path, cache_dir, dtypes)
+    manifest_path = parquet_path + ".json"
+    manifest = _load_manifest(manifest_path)
+    previous = manifest.get("source") if manifest else None
+    source = file_fingerprint(csv_path, previous)
+    if (manifest and manifest.get("version") == CACHE_VERSION and previous
+            and previous["sha256"] == source["sha256"] and os.path.exists(parquet_path)):
+        if previous != source:
+            manifest["source"] = source  # Touched but unchanged: refresh size/mtime only
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+        return parquet_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = parquet_path + ".tmp"
+    writer = None
+    rows = 0
+    try:
+        try:
+            for chunk in _iter_csv(csv_path, chunksize, None, dtypes):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(tmp_path, schema)
+                writer.write_table(table.cast(schema))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    except BaseException:
+        # Never leave a half-written copy behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if writer is None:
+        return None  # Header-only CSV: nothing worth caching
+    os.replace(tmp_path, parquet_path)
+    with open(manifest_path, "w") as f:
+        json.dump({"version": CACHE_VERSION, "source": source, "rows": rows}, f, indent=2)
+    print(f" Land-use Parquet cache rebuilt: {parquet_path} ({rows} rows)")
+    return parquet_path
+
+
+# Numeric codes for a (categorical) land_type column; missing or unmapped types get `default`.
+# Mapped as object so the fill value never has to be a category of the column.
+def land_type_codes(land_types, mapping, default=0.0, dtype="float32"):
+    return land_types.astype(object).map(mapping).fillna(default).to_numpy(dtype=dtype)
+
+
+# Land-use rows as DataFrames of at most `chunksize` rows each
+def iter_land_use(csv_path=LAND_USE_CSV, chunksize=CHUNKSIZE, columns=None, use_cache=True, dtypes=LAND_USE_DTYPES):
+    parquet_path = build_parquet_cache(csv_path, dtypes=dtypes) if use_cache else None
+    if parquet_path is None:
+        yield from _iter_csv(csv_path, chunksize, columns, dtypes)
+        return
+
+    _, pq = _pyarrow()
+    for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+# The whole file as one DataFrame (only the requested columns are read)
+def load_land_use(csv_path=LAND_USE_CSV, columns=None, use_cache=True, dtypes=LAND_USE_DTYPES):
+    parquet_path = build_parquet_cache(csv_path, dtypes=dtypes) if use_cache else None
+    if parquet_path is None:
+        return _promote_integers(pd.read_csv(csv_path, dtype=dtypes, usecols=columns))
+
+    _, pq = _pyarrow()
+    return pq.read_table(parquet_path, columns=columns).to_pandas()
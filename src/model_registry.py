@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+# Central, lazily-populated cache of the trained models.
+# Nothing (not even TensorFlow) is imported until a model is first requested, each model is
+# loaded at most once per process, and load times are recorded for reporting.
+# The "tflite" backend serves the exported .tflite files (see export_models.py) instead of
+# the Keras .h5 files; select it with ESG_INFERENCE_BACKEND=tflite or set_backend("tflite").
+# ESG_TFLITE_VARIANT (e.g. "int8", "float16", "dynamic"; see quantize_models.py) picks a
+# quantized file where one exists, falling back to the plain float export otherwise.
+
+MODELS_DIR = "models"
+BACKENDS = ("keras", "tflite")
+DEFAULT_BACKEND = os.environ.get("ESG_INFERENCE_BACKEND", "keras")
+DEFAULT_TFLITE_VARIANT = os.environ.get("ESG_TFLITE_VARIANT") or None
+
+# name -> file and whether to recompile with an mse loss (models saved with custom losses)
+MODEL_SPECS = {
+    "deforestation": {"file": "deforestation_model.h5", "recompile": False},
+    "water_pollution": {"file": "water_pollution_model.h5", "recompile": False},
+    "biodiversity": {"file": "biodiversity_model.h5", "recompile": True},
+    "natural_capital": {"file": "natural_capital_model.h5", "recompile": True},
+}
+
+
+class ModelRegistry:
+    def __init__(self, models_dir=MODELS_DIR, specs=MODEL_SPECS, backend=DEFAULT_BACKEND,
+                 tflite_variant=DEFAULT_TFLITE_VARIANT):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {BACKENDS}")
+        self.models_dir = models_dir
+        self.specs = dict(specs)
+        self.backend = backend
+        self.tflite_variant = tflite_variant
+        self.load_times = {}
+        self._models = {}
+        self._locks = {name: threading.Lock() for name in self.specs}
+
+    def path_for(self, name, backend=None, variant=None):
+        path = os.path.join(self.models_dir, self.specs[name]["file"])
+        if (backend or self.backend) == "tflite":
+            stem = os.path.splitext(path)[0]
+            variant = variant or self.tflite_variant
+            if variant and os.path.exists(f"{stem}_{variant}.tflite"):
+                return f"{stem}_{variant}.tflite"
+            path = stem + ".tflite"
+        return path
+
+    # Switch backend; models already loaded with the other backend are dropped
+    def set_backend(self, backend):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {BACKENDS}")
+        if backend != self.backend:
+            self.backend = backend
+            self._models.clear()
+            self.load_times.clear()
+
+    # Return the model, loading it on first use (thread-safe; concurrent callers share one load)
+    def get(self, name):
+        if name not in self.specs:
+            raise KeyError(f"Unknown model '{name}'. Available: {list(self.specs.keys())}")
+
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._locks[name]:
+            if name not in self._models:
+                self._models[name] = self._load(name)
+            return self._models[name]
+
+    def _load(self, name):
+        start_time = time.perf_counter()
+
+        if self.backend == "tflite":
+            from inference_backends import TFLiteModel
+            model = TFLiteModel(self.path_for(name))
+        else:
+            import tensorflow as tf
+
+            spec = self.specs[name]
+            model = tf.keras.models.load_model(self.path_for(name), compile=not spec["recompile"])
+            if spec["recompile"]:
+                model.compile(loss="mse", optimizer="adam")
+
+        self.load_times[name] = time.perf_counter() - start_time
+        print(f" Loaded {name} model ({self.backend}) in {self.load_times[name]:.2f}s")
+        return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    # Load several models (default: all available) now, optionally in a background thread
+    def preload(self, names=None, background=False):
+        names = list(names) if names is not None else [n for n in self.specs if os.path.exists(self.path_for(n))]
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f" Failed to preload {name} model: {e}")
+
+        if not background:
+            load_all()
+            return None
+
+        thread = threading.Thread(target=load_all, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def report(self):
+        for name in self.specs:
+            status = f"{self.load_times[name]:.2f}s" if name in self.load_times else "not loaded"
+            print(f" {name}: {status}")
+        return dict(self.load_times)
+
+
+# Process-wide default registry
+registry = ModelRegistry()
+
+def get_model(name):
+    return registry.get(name)
+
+def set_backend(backend):
+    registry.set_backend(backend)
@@ -1,26 +1,29 @@
-import pandas as pd
-import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, models
 import os
+import sys
 
-# Load & Preprocess Real Company Land-Use Data (CSV)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from land_use_data import load_land_use, read_columns
+
+# Load & Preprocess Real Company Land-Use Data (CSV, via the shared compact-dtype loader)
 def load_land_use_data(csv_file):
     if not os.path.exists(csv_file):
         print(f" Error: File {csv_file} not found!")
         return None
 
-    df = pd.read_csv(csv_file)
-
     # Check for necessary columns
     required_columns = {'land_area', 'land_type', 'biodiversity_index', 'carbon_sequestration', 'economic_value'}
-    if not required_columns.issubset(df.columns):
-        print(f" Error: Dataset is missing required columns: {required_columns - set(df.columns)}")
+    available_columns = set(read_columns(csv_file))
+    if not required_columns.issubset(available_columns):
+        print(f" Error: Dataset is missing required columns: {required_columns - available_columns}")
         return None
 
+    df = load_land_use(csv_file, columns=sorted(required_columns))
+
     # Convert Categorical Data to Numerical
     land_type_mapping = {"Forest": 1, "Wetland": 2, "Agricultural": 3, "Urban": 4}
-    df['land_type'] = df['land_type'].map(land_type_mapping)
+    df['land_type'] = df['land_type'].map(land_type_mapping).astype("float32")
 
     # Normalize Data (Min-Max Scaling)
     df[['land_area', 'biodiversity_index', 'carbon_sequestration', 'economic_value']] = df[
@@ -1,47 +1,28 @@
 import numpy as np
-import rasterio
-import tensorflow as tf
-import json
 import os
+import argparse
+from raster_io import load_standardized_tile
+from model_registry import registry, get_model, set_backend, BACKENDS, DEFAULT_BACKEND
+from bulk_scoring import collect_inputs, score_files
+from biodiversity_stream import load_trends, mean_prediction, preferred_trend_file
+from biodiversity_cache import cached_mean_prediction
+from scene_heatmap import score_scene, STRIDE
 
-# Custom Loss Function (Re-define 'mse' for TensorFlow)
-def custom_loss(y_true, y_pred):
-    return tf.keras.losses.mean_squared_error(y_true, y_pred)
-
-# Load Trained Models (Recompile)
-deforestation_model = tf.keras.models.load_model("models/deforestation_model.h5")
-water_pollution_model = tf.keras.models.load_model("models/water_pollution_model.h5")
-
-# Load Biodiversity Model with Custom Loss
-biodiversity_model = tf.keras.models.load_model("models/biodiversity_model.h5", compile=False)
-biodiversity_model.compile(loss=custom_loss, optimizer="adam")
-
-print(" All models loaded successfully!")
+# Trained models are loaded lazily on first use by the shared model registry
 
 # Define Image Size
 IMG_SIZE = (128, 128)
 
 # Function to Load & Preprocess TIFF Images
+# (mean-std normalization from a streaming pass; pixels are read directly at IMG_SIZE)
 def load_tiff_image(file_path):
-    with rasterio.open(file_path) as dataset:
-        image = dataset.read(1)  # Read single-band (grayscale)
-
-        # Apply mean-std normalization instead of min-max scaling
-        image = (image - np.mean(image)) / (np.std(image) + 1e-7)
-
-        # Clip values to be between 0 and 1
-        image = np.clip(image, 0, 1)
-
-        # Resize image to match model input size
-        image_resized = np.resize(image, IMG_SIZE).reshape(1, IMG_SIZE[0], IMG_SIZE[1], 1)
-
-    return image_resized
+    return load_standardized_tile(file_path, IMG_SIZE)
 
 
 # Function to Predict Deforestation
 def predict_deforestation(image_path):
     image = load_tiff_image(image_path)
-    prediction = deforestation_model.predict(image)
+    prediction = get_model("deforestation").predict(image)
     risk_score = prediction[0][0]
     print(f"🌳 Deforestation Risk Score: {risk_score:.4f}")
     return risk_score
@@ -49,30 +30,79 @@ def predict_deforestation(image_path):
 # Function to Predict Water Pollution
 def predict_water_pollution(image_path):
     image = load_tiff_image(image_path)
-    prediction = water_pollution_model.predict(image)
+    prediction = get_model("water_pollution").predict(image)
     pollution_score = prediction[0][0]
     print(f"🌊 Water Pollution Score: {pollution_score:.4f}")
     return pollution_score
 
-# Function to Predict Biodiversity Loss
-def predict_biodiversity(json_path):
-    with open(json_path, "r") as f:
-        data = json.load(f)
-
-    X = []
-    for entry in data:
-        if "normalized_trend" in entry and len(entry["normalized_trend"]) > 1:
-            X.append(entry["normalized_trend"][:-1])  # Features: All years except last
-
-    X = np.array(X).reshape(-1, len(X[0]), 1)  # Reshape for LSTM model
-    predictions = biodiversity_model.predict(X)
-
-    avg_loss_risk = np.mean(predictions)
+# Function to Load Biodiversity Trends (.json, .ndjson or .npy) as an LSTM batch
+def load_biodiversity_trends(json_path):
+    return load_trends(json_path)
+
+# Function to Predict Biodiversity Loss (streamed in fixed-size batches); with use_cache, per-population
+# predictions are kept in data/biodiversity/cache and only new or changed series are re-scored
+def predict_biodiversity(json_path, batch_size=1024, use_cache=True):
+    model = get_model("biodiversity")
+    if use_cache:
+        avg_loss_risk = cached_mean_prediction(json_path, model.predict_on_batch,
+                                               registry.path_for("biodiversity"), batch_size=batch_size)
+    else:
+        avg_loss_risk = mean_prediction(model.predict_on_batch, preferred_trend_file(json_path), batch_size)
     print(f"🦜 Biodiversity Loss Risk Score: {avg_loss_risk:.4f}")
     return avg_loss_risk
 
+# Per-file loaders and score reducers used by bulk scoring
+BULK_LOADERS = {
+    "deforestation": load_tiff_image,
+    "water_pollution": load_tiff_image,
+    "biodiversity": load_biodiversity_trends,
+}
+BULK_REDUCERS = {
+    "deforestation": lambda predictions: predictions[0][0],
+    "water_pollution": lambda predictions: predictions[0][0],
+    "biodiversity": lambda predictions: np.mean(predictions),  # Mean risk over the file's populations
+}
+
+# Score many files: GeoTIFFs with image_model, biodiversity JSON files with the LSTM
+def predict_bulk(inputs, output_path, image_model="deforestation", batch_size=64, readers=4):
+    paths = collect_inputs(inputs)
+    print(f" Scoring {len(paths)} file(s) (batch size {batch_size}, {readers} reader thread(s))")
+    return score_files(paths, image_model, output_path, BULK_LOADERS, BULK_REDUCERS,
+                       batch_size=batch_size, readers=readers)
+
+# Score a whole GeoTIFF scene as overlapping IMG_SIZE patches and save the risk heatmap GeoTIFF
+def predict_scene(image_path, output_path, image_model="deforestation", stride=STRIDE, batch_size=64):
+    return score_scene(image_path, output_path, get_model(image_model), patch=IMG_SIZE[0], stride=stride,
+                       batch_size=batch_size)
+
 # Example Usage
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ESG risk models on GeoTIFF / biodiversity JSON files.")
+    parser.add_argument("inputs", nargs="*", help="Files, directories or globs to score (default: the sample test files)")
+    parser.add_argument("--model", type=str, default="deforestation", choices=["deforestation", "water_pollution"],
+                        help="Model for GeoTIFF inputs (JSON files always use the biodiversity model)")
+    parser.add_argument("--output", type=str, default="data/predictions/scores.csv", help="Output .csv or .parquet file")
+    parser.add_argument("--batch-size", type=int, default=64, help="Inputs per forward pass")
+    parser.add_argument("--readers", type=int, default=os.cpu_count() or 4, help="Parallel file reader threads")
+    parser.add_argument("--backend", type=str, default=DEFAULT_BACKEND, choices=BACKENDS,
+                        help="Inference backend: keras (.h5) or tflite (run export_models.py first)")
+    parser.add_argument("--heatmap", type=str, default=None, metavar="DIR",
+                        help="Score each GeoTIFF as a full scene and write <DIR>/<name>_<model>_heatmap.tif")
+    parser.add_argument("--stride", type=int, default=STRIDE, help="Patch stride in pixels for --heatmap")
+    args = parser.parse_args()
+    set_backend(args.backend)
+
+    if args.heatmap:
+        for path in collect_inputs(args.inputs, extensions=(".tif", ".tiff")):
+            name = os.path.splitext(os.path.basename(path))[0]
+            output_path = os.path.join(args.heatmap, f"{name}_{args.model}_heatmap.tif")
+            predict_scene(path, output_path, args.model, args.stride, args.batch_size)
+        raise SystemExit(0)
+
+    if args.inputs:
+        predict_bulk(args.inputs, args.output, args.model, args.batch_size, args.readers)
+        raise SystemExit(0)
+
     deforestation_test_image = "data/deforestation/test/forest_loss_test.tif"
     water_pollution_test_image = "data/water_pollution/test/ndwi_test.tif"
     biodiversity_test_json = "data/biodiversity/test/biodiversity_loss_test.json"
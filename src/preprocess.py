@@ -1,8 +1,9 @@
 import os
-import rasterio
-import numpy as np
 import cv2
 import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from raster_io import read_band_with_stats, to_uint8
 
 # Define dataset paths
 DATASETS = {
@@ -29,29 +30,41 @@ for dataset in DATASETS.values():
 
 # Function to preprocess .tif images and save them as .jpg
 def preprocess_image(tif_path, jpg_path):
-    with rasterio.open(tif_path) as dataset:
-        image = dataset.read(1)  # Read single-band grayscale
+    image, stats = read_band_with_stats(tif_path)  # Single-band grayscale, float32
 
-        # Normalize image (0-255 scaling)
-        image = (image - image.min()) / (image.max() - image.min() + 1e-7) * 255
-        image = image.astype(np.uint8)  # Convert to 8-bit
+    # Normalize image (0-255 scaling)
+    image = to_uint8(image, stats)  # Convert to 8-bit
 
-        # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        image = clahe.apply(image)
+    # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    image = clahe.apply(image)
 
-        # Save processed image
-        cv2.imwrite(jpg_path, image)
-        print(f" Processed: {jpg_path}")
+    # Save processed image
+    cv2.imwrite(jpg_path, image)
+    print(f" Processed: {jpg_path}")
+
+# Worker wrapper: returns the error instead of raising so one bad tile doesn't stop the run
+def process_task(task):
+    tif_path, jpg_path = task
+    try:
+        preprocess_image(tif_path, jpg_path)
+        return tif_path, None
+    except Exception as e:
+        return tif_path, str(e)
+
+# An output is current if it exists and is newer than its source
+def is_up_to_date(tif_path, jpg_path):
+    return os.path.exists(jpg_path) and os.path.getmtime(jpg_path) >= os.path.getmtime(tif_path)
 
 # Main function to process images for a given dataset
-def process_dataset(dataset_name):
+def process_dataset(dataset_name, workers=1, chunksize=None, force=False):
     if dataset_name not in DATASETS:
         print(f"Error: Dataset '{dataset_name}' not found. Choose from: {list(DATASETS.keys())}")
         return
 
     paths = DATASETS[dataset_name]
 
+    tasks, skipped = [], 0
     for data_type in ["train", "test"]:
         input_folder = paths[data_type]
         output_folder = paths["output"]
@@ -60,14 +73,48 @@ def process_dataset(dataset_name):
             if filename.endswith(".tif"):
                 tif_path = os.path.join(input_folder, filename)
                 jpg_path = os.path.join(output_folder, filename.replace(".tif", ".jpg"))
-                preprocess_image(tif_path, jpg_path)
+                if not force and is_up_to_date(tif_path, jpg_path):
+                    skipped += 1
+                else:
+                    tasks.append((tif_path, jpg_path))
+
+    start_time = time.perf_counter()
+    failed = []
+    report_every = max(1, len(tasks) // 20)
+
+    def report(results):
+        for done, (tif_path, error) in enumerate(results, 1):
+            if error is not None:
+                failed.append(tif_path)
+                print(f" Failed: {tif_path}: {error}")
+            if done % report_every == 0 or done == len(tasks):
+                rate = done / max(time.perf_counter() - start_time, 1e-9)
+                print(f" Progress: {done}/{len(tasks)} ({rate:.1f} images/s)")
+
+    if workers > 1 and len(tasks) > 1:
+        if chunksize is None:
+            chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            report(executor.map(process_task, tasks, chunksize=chunksize))
+    else:
+        report(process_task(task) for task in tasks)
+
+    elapsed = time.perf_counter() - start_time
+    processed = len(tasks) - len(failed)
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f" {dataset_name}: {processed} processed, {skipped} up to date, {len(failed)} failed "
+          f"in {elapsed:.1f}s ({rate:.1f} images/s, {workers} worker(s))")
 
-    print(f" All {dataset_name} images processed successfully!")
+    if not failed:
+        print(f" All {dataset_name} images processed successfully!")
 
 # Command-line argument parsing
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Preprocess satellite images for AI training.")
     parser.add_argument("--dataset", type=str, required=True, help="Dataset to process: deforestation, water_pollution, biodiversity")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel worker processes (1 = serial)")
+    parser.add_argument("--chunksize", type=int, default=None, help="Images dispatched per worker task")
+    parser.add_argument("--force", action="store_true", help="Reprocess images even if the output is newer than the source")
     
     args = parser.parse_args()
-    process_dataset(args.dataset)
+    process_dataset(args.dataset, workers=args.workers, chunksize=args.chunksize, force=args.force)
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from model_registry import ModelRegistry, MODELS_DIR
+from inference_backends import TFLiteModel
+from raster_io import load_standardized_tile
+
+# Post-training quantization of the CNN risk models, with an accuracy / latency comparison
+# against the float Keras model. Outputs models/<model>_<mode>.tflite, selectable at inference
+# time with ESG_INFERENCE_BACKEND=tflite ESG_TFLITE_VARIANT=<mode>.
+
+IMG_SIZE = (128, 128)
+MODES = ("dynamic", "float16", "int8")
+
+# Calibration tiles (training set), evaluation tiles (test set) and filename labelling per model
+QUANTIZABLE_MODELS = {
+    "deforestation": {
+        "calibration_dir": "data/deforestation/train",
+        "eval_dir": "data/deforestation/test",
+        "label": lambda filename: 1 if "deforested" in filename else 0,
+    },
+    "water_pollution": {
+        "calibration_dir": "data/water_pollution/train",
+        "eval_dir": "data/water_pollution/test",
+        "label": lambda filename: 1 if "clean" in filename.lower() else 0,
+    },
+}
+
+REPORT_PATH = "models/quantization_report.json"
+
+
+# Inference-ready tiles (same preprocessing as predict.py) and their filename labels
+def load_tiles(folder, label_fn, limit=None):
+    filenames = []
+    if os.path.isdir(folder):
+        filenames = sorted(name for name in os.listdir(folder) if name.endswith(".tif"))[:limit]
+    if not filenames:
+        return np.zeros((0,) + IMG_SIZE + (1,), dtype=np.float32), np.zeros(0, dtype=np.int64)
+    images = np.concatenate([load_standardized_tile(os.path.join(folder, name), IMG_SIZE) for name in filenames])
+    labels = np.array([label_fn(name) for name in filenames])
+    return images.astype(np.float32), labels
+
+
+# Convert a Keras model with one post-training quantization mode
+def convert_quantized(model, mode, calibration_images=None):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if mode == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == "int8":
+        if calibration_images is None or len(calibration_images) == 0:
+            raise ValueError("int8 quantization needs calibration tiles")
+
+        def representative_dataset():
+            for image in calibration_images:
+                yield [image[np.newaxis].astype(np.float32)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    elif mode != "dynamic":
+        raise ValueError(f"Unknown quantization mode '{mode}'. Choose from: {MODES}")
+
+    return converter.convert()
+
+
+# Mean seconds per tile over `repeats` calls on a batch (None when there is nothing to time)
+def time_per_tile(predict_fn, batch, repeats=5):
+    if len(batch) == 0:
+        return None
+    predict_fn(batch)  # warm-up
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        predict_fn(batch)
+    return (time.perf_counter() - start_time) / (repeats * len(batch))
+
+
+# Accuracy (at 0.5), agreement with the float model and latency for one set of predictions
+def compare(predictions, reference, labels, latency, size_bytes):
+    predictions = np.asarray(predictions).reshape(-1)
+    reference = np.asarray(reference).reshape(-1)
+    result = {
+        "size_kb": round(size_bytes / 1024, 1),
+        "latency_ms_per_tile": round(latency * 1000, 3) if latency is not None else None,
+        "max_abs_diff_vs_keras": float(np.max(np.abs(predictions - reference))) if len(reference) else 0.0,
+        "agreement_vs_keras": float(np.mean((predictions >= 0.5) == (reference >= 0.5))) if len(reference) else 1.0,
+    }
+    if len(labels):
+        result["accuracy"] = float(np.mean((predictions >= 0.5) == labels))
+    return result
+
+
+def quantize_model(name, registry, modes, num_calibration, num_eval, batch_size):
+    config = QUANTIZABLE_MODELS[name]
+    keras_model = registry.get(name)
+    stem = os.path.splitext(registry.path_for(name, backend="keras"))[0]
+
+    calibration_images, _ = load_tiles(config["calibration_dir"], config["label"], num_calibration)
+    eval_images, eval_labels = load_tiles(config["eval_dir"], config["label"], num_eval)
+    if len(eval_images) == 0 and len(calibration_images) == 0:
+        print(f" Skipping {name}: no sample tiles in {config['calibration_dir']} or {config['eval_dir']}")
+        return None
+    if len(eval_images) == 0:
+        # No labelled test tiles available: compare on calibration tiles only (no accuracy)
+        eval_images, eval_labels = calibration_images, np.zeros(0, dtype=np.int64)
+    if len(calibration_images) == 0 and "int8" in modes:
+        print(f" Skipping int8 for {name}: no calibration tiles in {config['calibration_dir']}")
+        modes = [mode for mode in modes if mode != "int8"]
+
+    timing_batch = eval_images[:batch_size]
+    reference = np.asarray(keras_model.predict(eval_images, batch_size=batch_size, verbose=0))
+    results = {"keras": compare(
+        reference, reference, eval_labels,
+        time_per_tile(keras_model.predict_on_batch, timing_batch),
+        os.path.getsize(registry.path_for(name, backend="keras")),
+    )}
+
+    for mode in modes:
+        tflite_path = f"{stem}_{mode}.tflite"
+        with open(tflite_path, "wb") as f:
+            f.write(convert_quantized(keras_model, mode, calibration_images))
+
+        tflite_model = TFLiteModel(tflite_path)
+        predictions = tflite_model.predict(eval_images, batch_size=batch_size)
+        results[mode] = compare(
+            predictions, reference, eval_labels,
+            time_per_tile(tflite_model.predict_on_batch, timing_batch),
+            os.path.getsize(tflite_path),
+        )
+        print(f" Saved {tflite_path}")
+
+    return results
+
+
+def print_report(report):
+    for name, results in report.items():
+        print(f"\n📊 {name}")
+        print(f"   {'variant':<10}{'size KB':>10}{'ms/tile':>10}{'accuracy':>10}{'agree':>8}{'max diff':>11}")
+        for variant, r in results.items():
+            accuracy = f"{r['accuracy']:.3f}" if "accuracy" in r else "n/a"
+            latency = f"{r['latency_ms_per_tile']:.3f}" if r["latency_ms_per_tile"] is not None else "n/a"
+            print(f"   {variant:<10}{r['size_kb']:>10.1f}{latency:>10}{accuracy:>10}"
+                  f"{r['agreement_vs_keras']:>8.3f}{r['max_abs_diff_vs_keras']:>11.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantize the CNN risk models and compare accuracy/latency.")
+    parser.add_argument("--models", nargs="+", default=list(QUANTIZABLE_MODELS.keys()), choices=list(QUANTIZABLE_MODELS.keys()))
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--models-dir", type=str, default=MODELS_DIR)
+    parser.add_argument("--num-calibration", type=int, default=200, help="Training tiles used to calibrate int8 ranges")
+    parser.add_argument("--num-eval", type=int, default=500, help="Test tiles used for the comparison")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--report", type=str, default=REPORT_PATH, help="Where to write the JSON comparison report")
+
+    args = parser.parse_args()
+    registry = ModelRegistry(args.models_dir, backend="keras", tflite_variant=None)
+
+    report = {}
+    for name in args.models:
+        if not os.path.exists(registry.path_for(name)):
+            print(f" Skipping {name}: {registry.path_for(name)} not found")
+            continue
+        results = quantize_model(name, registry, args.modes, args.num_calibration, args.num_eval, args.batch_size)
+        if results is not None:
+            report[name] = results
+
+    print_report(report)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n Quantization report saved: {args.report}")
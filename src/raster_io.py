@@ -0,0 +1,76 @@
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+
+# Shared GeoTIFF reading helpers.
+# Large tiles (e.g. 1°x1° Hansen at 30 m, ~3700x3700) are never materialized at full
+# resolution as float64: statistics come from a streaming pass over the file's blocks and
+# pixels are read straight at the target size (using overviews when the file has them).
+
+
+# Streaming min / max / mean / std of one band, block by block
+def band_stats(path, band=1):
+    with rasterio.open(path) as dataset:
+        return dataset_band_stats(dataset, band)
+
+def dataset_band_stats(dataset, band=1):
+    count = 0
+    total = 0.0
+    total_sq = 0.0
+    min_val = np.inf
+    max_val = -np.inf
+
+    for _, window in dataset.block_windows(band):
+        block = dataset.read(band, window=window).astype(np.float64, copy=False)
+        count += block.size
+        total += block.sum()
+        total_sq += np.square(block).sum()
+        min_val = min(min_val, block.min())
+        max_val = max(max_val, block.max())
+
+    if count == 0:
+        return {"min": 0.0, "max": 0.0, "mean": 0.0, "std": 0.0, "count": 0}
+
+    mean = total / count
+    std = np.sqrt(max(total_sq / count - mean * mean, 0.0))
+    return {"min": float(min_val), "max": float(max_val), "mean": float(mean), "std": float(std), "count": count}
+
+
+# Read one band resampled directly to out_shape (rows, cols) as float32
+def read_band(path, out_shape=None, band=1, resampling=Resampling.average, window=None):
+    with rasterio.open(path) as dataset:
+        return read_dataset_band(dataset, out_shape, band, resampling, window)
+
+def read_dataset_band(dataset, out_shape=None, band=1, resampling=Resampling.average, window=None):
+    if out_shape is None:
+        image = dataset.read(band, window=window)
+    else:
+        image = dataset.read(band, out_shape=tuple(out_shape), resampling=resampling, window=window)
+    return image.astype(np.float32, copy=False)
+
+
+# Read a band at out_shape together with full-resolution statistics, in one open
+def read_band_with_stats(path, out_shape=None, band=1, resampling=Resampling.average):
+    with rasterio.open(path) as dataset:
+        stats = dataset_band_stats(dataset, band)
+        image = read_dataset_band(dataset, out_shape, band, resampling)
+    return image, stats
+
+
+# Pixel window of (row_off, col_off, height, width)
+def pixel_window(row_off, col_off, height, width):
+    return Window(col_off, row_off, width, height)
+
+
+# Model-ready (1, H, W, 1) tile standardized with full-resolution mean/std and clipped to [0, 1]
+def load_standardized_tile(path, size=(128, 128)):
+    image, stats = read_band_with_stats(path, out_shape=size)
+    image = (image - stats["mean"]) / (stats["std"] + 1e-7)
+    return np.clip(image, 0, 1).reshape(1, size[0], size[1], 1)
+
+
+# Min-max scale to 0-255 uint8 using (streamed) statistics
+def to_uint8(image, stats):
+    scaled = (image - stats["min"]) / (stats["max"] - stats["min"] + 1e-7) * 255
+    return scaled.astype(np.uint8)
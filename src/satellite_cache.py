@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# On-disk cache of exported satellite index tiles (NDVI, NDWI, ...).
+# A tile is identified by (location, date range, index, scale, buffer); the location is rounded to
+# LOCATION_DECIMALS so nearby requests for the same site share a tile. Entries older than the TTL
+# are re-fetched, and least recently used tiles are evicted once the cache exceeds MAX_CACHE_BYTES.
+
+CACHE_DIR = "data/geospatial/cache"
+TTL_DAYS = 7
+MAX_CACHE_BYTES = 2 * 1024 ** 3
+LOCATION_DECIMALS = 4  # ~11 m at the equator
+
+
+def tile_params(latitude, longitude, start_date, end_date, index, scale, buffer_m):
+    return {
+        "latitude": round(float(latitude), LOCATION_DECIMALS),
+        "longitude": round(float(longitude), LOCATION_DECIMALS),
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "index": index,
+        "scale": scale,
+        "buffer_m": buffer_m,
+    }
+
+
+def tile_key(params):
+    payload = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+
+class SatelliteTileCache:
+    def __init__(self, cache_dir=CACHE_DIR, ttl_days=TTL_DAYS, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.ttl_days = ttl_days
+        self.max_bytes = max_bytes
+        self.entries = self._load()
+        self._touched = set()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _load(self):
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r") as f:
+                    return json.load(f).get("entries", {})
+            except (OSError, ValueError) as e:
+                print(f" Ignoring unreadable tile cache manifest {self.manifest_path}: {e}")
+        return {}
+
+    def path_for(self, params):
+        return os.path.join(self.cache_dir, f"{params['index']}_{tile_key(params)}.tif")
+
+    # Cached tile path if it exists and is younger than the TTL (marks it as recently used)
+    def get(self, params):
+        key = tile_key(params)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or not os.path.exists(entry["path"]):
+                return None
+            if self.ttl_days is not None and time.time() - entry["created_at"] > self.ttl_days * 86400:
+                return None
+            entry["last_used"] = time.time()
+            self._touched.add(key)
+            return entry["path"]
+
+    def put(self, params, path):
+        key = tile_key(params)
+        now = time.time()
+        with self._lock:
+            self.entries[key] = {
+                "params": params,
+                "path": path,
+                "size": os.path.getsize(path),
+                "created_at": now,
+                "last_used": now,
+            }
+            self._touched.add(key)
+
+    # Return the cached tile, calling fetch_fn(params, path) to export it when missing or stale.
+    # Concurrent requests for the same tile wait for a single fetch.
+    def get_or_fetch(self, params, fetch_fn):
+        key = tile_key(params)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            path = self.get(params)
+            if path is not None:
+                return path
+            path = self.path_for(params)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = os.path.join(self.cache_dir, f"tmp_{key}.tif")
+            # A leftover from an interrupted run must never pass for this fetch's result
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            fetch_fn(params, tmp_path)
+            # Exporters such as geemap report failures by printing, so check the file itself
+            if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise RuntimeError(f"No {params['index']} tile was exported for {params}")
+            os.replace(tmp_path, path)
+            self.put(params, path)
+            return path
+
+    # Remove expired tiles, then least recently used ones over the size cap (tiles used in this
+    # run are kept); returns the evicted keys
+    def evict(self):
+        evicted = []
+        now = time.time()
+        with self._lock:
+            if self.ttl_days is not None:
+                cutoff = now - self.ttl_days * 86400
+                evicted += [key for key, entry in self.entries.items()
+                            if entry["created_at"] < cutoff and key not in self._touched]
+
+            if self.max_bytes is not None:
+                remaining = sorted(
+                    (item for item in self.entries.items() if item[0] not in evicted),
+                    key=lambda item: item[1]["last_used"]
+                )
+                total = sum(entry["size"] for _, entry in remaining)
+                for key, entry in remaining:
+                    if total <= self.max_bytes:
+                        break
+                    if key in self._touched:
+                        continue
+                    evicted.append(key)
+                    total -= entry["size"]
+
+            for key in evicted:
+                path = self.entries.pop(key)["path"]
+                if os.path.exists(path):
+                    os.remove(path)
+
+        if evicted:
+            print(f" Evicted {len(evicted)} cached satellite tile(s).")
+        return evicted
+
+    # Atomic write so an interrupted run never leaves a truncated manifest
+    def save(self):
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"entries": self.entries}, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import rasterio
+from affine import Affine
+from numpy.lib.stride_tricks import sliding_window_view
+
+from raster_io import read_dataset_band, pixel_window
+
+# Full-scene risk heatmaps: a large raster is cut into overlapping patch x patch inputs with a
+# strided view (no per-patch copies until a batch is assembled), the patches are scored in batches
+# and each score becomes one pixel of a georeferenced heatmap. Heatmap pixel (i, j) is centred on
+# the patch starting at row i * stride, column j * stride and covers stride x stride source pixels.
+# The scene is processed in row strips, so memory is bounded by the strip, not the raster.
+
+PATCH_SIZE = 128
+STRIDE = 64
+BATCH_SIZE = 64
+STRIP_PATCH_ROWS = 8  # Heatmap rows produced per strip
+
+
+# Patch grid size for a raster of (height, width)
+def patch_grid(height, width, patch=PATCH_SIZE, stride=STRIDE):
+    if height < patch or width < patch:
+        raise ValueError(f"Raster ({height}x{width}) is smaller than one {patch}x{patch} patch")
+    return (height - patch) // stride + 1, (width - patch) // stride + 1
+
+
+# (rows, cols, patch, patch) view of every patch in a strip of pixels; no data is copied
+def strip_patches(strip, patch=PATCH_SIZE, stride=STRIDE):
+    return sliding_window_view(strip, (patch, patch))[::stride, ::stride]
+
+
+# Model-ready batch from patches: each patch standardized with its own mean/std and clipped to
+# [0, 1], like load_standardized_tile does for a whole tile
+def standardize_patches(patches):
+    mean = patches.mean(axis=(-2, -1), keepdims=True)
+    std = patches.std(axis=(-2, -1), keepdims=True)
+    batch = np.clip((patches - mean) / (std + 1e-7), 0, 1)
+    return batch.reshape(-1, patches.shape[-2], patches.shape[-1], 1).astype(np.float32, copy=False)
+
+
+# Heatmap georeferencing: stride-sized pixels centred on the patch centres
+def heatmap_transform(transform, patch=PATCH_SIZE, stride=STRIDE):
+    offset = (patch - stride) / 2
+    return transform * Affine.translation(offset, offset) * Affine.scale(stride)
+
+
+# Score every patch of the scene with model and write the heatmap GeoTIFF to output_path
+def score_scene(input_path, output_path, model, patch=PATCH_SIZE, stride=STRIDE, batch_size=BATCH_SIZE,
+                strip_patch_rows=STRIP_PATCH_ROWS, band=1):
+    with rasterio.open(input_path) as src:
+        grid_rows, grid_cols = patch_grid(src.height, src.width, patch, stride)
+        profile = {
+            "driver": "GTiff", "height": grid_rows, "width": grid_cols, "count": 1, "dtype": "float32",
+            "crs": src.crs, "transform": heatmap_transform(src.transform, patch, stride), "nodata": np.nan,
+            "compress": "deflate",
+        }
+        nodata = src.nodata
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with rasterio.open(output_path, "w", **profile) as dst:
+            for first_row in range(0, grid_rows, strip_patch_rows):
+                rows = min(strip_patch_rows, grid_rows - first_row)
+                window = pixel_window(first_row * stride, 0, patch + (rows - 1) * stride, src.width)
+                strip = read_dataset_band(src, band=band, window=window)
+                patches = strip_patches(strip, patch, stride)[:rows, :grid_cols]
+
+                scores = np.empty(rows * grid_cols, dtype=np.float32)
+                for start in range(0, rows * grid_cols, batch_size):
+                    stop = min(start + batch_size, rows * grid_cols)
+                    # Fancy indexing copies only this batch's patches out of the view
+                    index = np.unravel_index(np.arange(start, stop), (rows, grid_cols))
+                    predictions = np.asarray(model.predict_on_batch(standardize_patches(patches[index])))
+                    scores[start:stop] = predictions.reshape(stop - start, -1)[:, 0]
+                scores = scores.reshape(rows, grid_cols)
+
+                # Patches that are mostly nodata get no score
+                if nodata is not None:
+                    valid = ~np.isnan(strip) if np.isnan(nodata) else strip != nodata
+                    valid = strip_patches(valid.astype(np.float32), patch, stride)[:rows, :grid_cols]
+                    scores[valid.mean(axis=(-2, -1)) < 0.5] = np.nan
+
+                dst.write(scores, 1, window=pixel_window(first_row, 0, rows, grid_cols))
+
+    print(f" Risk heatmap ({grid_rows}x{grid_cols} patches of {patch}px, stride {stride}) saved: {output_path}")
+    return output_path
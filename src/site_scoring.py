@@ -0,0 +1,139 @@
+import os
+
+import numpy as np
+import rasterio
+from rasterio.warp import transform, transform_bounds
+from rasterio.windows import Window, from_bounds
+
+from raster_io import read_dataset_band
+from bulk_scoring import collect_inputs
+
+# Per-site scoring against the GeoTIFFs already on disk.
+# TileIndex acts as a virtual mosaic of the downloaded tiles: their lon/lat bounds are sorted by
+# west edge, so the tiles that can contain a point are one contiguous run found by binary search
+# (O(log n) per lookup). For each site a window around the point (or over its footprint) is read
+# from the finest covering tile and the windows are scored in batches.
+
+WINDOW_SIZE = (128, 128)
+
+
+class TileIndex:
+    def __init__(self, paths, bounds):
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        order = np.argsort(bounds[:, 0], kind="stable")
+        self.paths = [paths[i] for i in order]
+        self.min_lon, self.min_lat, self.max_lon, self.max_lat = bounds[order].T
+        self.area = (self.max_lon - self.min_lon) * (self.max_lat - self.min_lat)
+        self.max_width = float((self.max_lon - self.min_lon).max()) if len(self.paths) else 0.0
+
+    # Index every GeoTIFF in the given folders / globs / files (only headers are read)
+    @classmethod
+    def from_sources(cls, sources):
+        paths, bounds = [], []
+        sources = [source for source in sources if os.path.exists(source) or any(ch in source for ch in "*?[")]
+        for path in collect_inputs(sources, extensions=(".tif", ".tiff")):
+            try:
+                with rasterio.open(path) as dataset:
+                    box = tuple(dataset.bounds)
+                    if dataset.crs is not None and dataset.crs.to_epsg() != 4326:
+                        box = transform_bounds(dataset.crs, "EPSG:4326", *box)
+            except Exception as e:
+                print(f" Skipping unreadable tile {path}: {e}")
+                continue
+            paths.append(path)
+            bounds.append(box)
+        return cls(paths, bounds)
+
+    def __len__(self):
+        return len(self.paths)
+
+    # Index of the finest tile containing each (lon, lat) point, -1 where none does
+    def query(self, longitudes, latitudes):
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        hi = np.searchsorted(self.min_lon, longitudes, side="right")
+        lo = np.searchsorted(self.min_lon, longitudes - self.max_width, side="left")
+
+        found = np.full(len(longitudes), -1, dtype=np.int64)
+        for i, (start, stop, lon, lat) in enumerate(zip(lo, hi, longitudes, latitudes)):
+            candidates = np.arange(start, stop)
+            inside = candidates[(self.max_lon[start:stop] >= lon)
+                                & (self.min_lat[start:stop] <= lat) & (self.max_lat[start:stop] >= lat)]
+            if len(inside):
+                found[i] = inside[np.argmin(self.area[inside])]
+        return found
+
+
+# Window of `size` native pixels centred on the (lon, lat) point, shifted to stay inside the raster
+def point_window(dataset, longitude, latitude, size=WINDOW_SIZE):
+    x, y = longitude, latitude
+    if dataset.crs is not None and dataset.crs.to_epsg() != 4326:
+        xs, ys = transform("EPSG:4326", dataset.crs, [longitude], [latitude])
+        x, y = xs[0], ys[0]
+    row, col = dataset.index(x, y)
+    height, width = min(size[0], dataset.height), min(size[1], dataset.width)
+    row_off = int(np.clip(row - height // 2, 0, dataset.height - height))
+    col_off = int(np.clip(col - width // 2, 0, dataset.width - width))
+    return Window(col_off, row_off, width, height)
+
+
+# Footprint (min_lon, min_lat, max_lon, max_lat) as a pixel window clipped to the raster
+# (None when the footprint does not overlap it)
+def footprint_window(dataset, bbox):
+    if dataset.crs is not None and dataset.crs.to_epsg() != 4326:
+        bbox = transform_bounds("EPSG:4326", dataset.crs, *bbox)
+    window = from_bounds(*bbox, transform=dataset.transform).round_offsets().round_lengths()
+    try:
+        window = window.intersection(Window(0, 0, dataset.width, dataset.height))
+    except Exception:
+        return None
+    return window if window.width >= 1 and window.height >= 1 else None
+
+
+# Model-ready (1, H, W, 1) window, standardized with its own mean/std and clipped to [0, 1]
+def read_site_window(dataset, longitude, latitude, bbox=None, size=WINDOW_SIZE):
+    window = footprint_window(dataset, bbox) if bbox is not None else None
+    if window is None:
+        window = point_window(dataset, longitude, latitude, size)
+    image = read_dataset_band(dataset, out_shape=size, window=window)
+    image = (image - image.mean()) / (image.std() + 1e-7)
+    return np.clip(image, 0, 1).reshape(1, size[0], size[1], 1)
+
+
+# Score every site covered by the index; uncovered sites get NaN.
+# bboxes: optional per-site footprints (None entries fall back to the point window).
+def score_sites(index, model, longitudes, latitudes, bboxes=None, batch_size=256, size=WINDOW_SIZE):
+    tile_ids = index.query(longitudes, latitudes)
+    scores = np.full(len(tile_ids), np.nan, dtype=np.float32)
+    covered = np.flatnonzero(tile_ids >= 0)
+    # Visit sites tile by tile so each file is opened once per batch
+    covered = covered[np.argsort(tile_ids[covered], kind="stable")]
+
+    for start in range(0, len(covered), batch_size):
+        sites = covered[start:start + batch_size]
+        windows = []
+        dataset = None
+        open_path = None
+        try:
+            for site in sites:
+                path = index.paths[tile_ids[site]]
+                if path != open_path:
+                    if dataset is not None:
+                        dataset.close()
+                    dataset = rasterio.open(path)
+                    open_path = path
+                bbox = bboxes[site] if bboxes is not None else None
+                windows.append(read_site_window(dataset, longitudes[site], latitudes[site], bbox, size))
+        finally:
+            if dataset is not None:
+                dataset.close()
+        predictions = np.asarray(model.predict_on_batch(np.concatenate(windows)))
+        scores[sites] = predictions.reshape(len(sites), -1)[:, 0]
+    return scores
+
+
+# Downloaded tiles indexed for each model (see the download_* scripts)
+TILE_SOURCES = {
+    "deforestation": ["data/deforestation/train", "data/deforestation/test"],
+    "water_pollution": ["data/water_pollution/train", "data/water_pollution/test"],
+}
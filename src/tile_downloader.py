@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+# Concurrent, resumable GeoTIFF tile downloads.
+# A tile is a dict: {"name": "<file>.tif", "bbox": (min_lon, min_lat, max_lon, max_lat), "scale": metres}.
+# Tiles are fetched by a backend on a bounded thread pool; a shared rate limiter spaces out requests,
+# failures are retried with exponential backoff, and <folder>/.partial/manifest.json records finished
+# tiles so an interrupted run resumes where it stopped. Backends:
+#   EarthEngineBackend  geemap.ee_export_image of an Earth Engine image
+#   SyntheticBackend    deterministic local GeoTIFFs (tests and benchmarks, no network)
+
+WORKERS = 8
+REQUESTS_PER_SECOND = 4.0
+MAX_ATTEMPTS = 5
+BASE_DELAY = 2.0   # Seconds before the first retry; doubles on every further attempt
+MAX_DELAY = 60.0
+SAVE_EVERY = 25    # Manifest writes are batched to this many finished tiles
+EE_PROJECT = "ee-sbishnoi29"
+BACKENDS = ("earthengine", "synthetic")
+# Bookkeeping lives in a hidden subfolder so tools listing <folder> (e.g. bulk scoring, which would
+# take a manifest.json for a trend file) only see the tiles
+WORK_DIR = ".partial"
+
+
+# Thread-safe request spacing: at most `rate` calls per second across all workers
+class RateLimiter:
+    def __init__(self, rate=REQUESTS_PER_SECOND):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def backoff_delay(attempt, base=BASE_DELAY, cap=MAX_DELAY):
+    # Full jitter keeps retrying workers from hitting the service in lockstep
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class EarthEngineBackend:
+    # image_fn() builds the ee.Image to export; it runs once, after Earth Engine is initialized
+    def __init__(self, image_fn, project=EE_PROJECT):
+        self.image_fn = image_fn
+        self.project = project
+        self._image = None
+        self._lock = threading.Lock()
+
+    def _get_image(self):
+        with self._lock:
+            if self._image is None:
+                import ee
+                ee.Initialize(project=self.project)
+                self._image = self.image_fn()
+            return self._image
+
+    def fetch(self, tile, path):
+        import ee
+        import geemap
+
+        image = self._get_image()
+        region = ee.Geometry.Rectangle(list(tile["bbox"]))
+        geemap.ee_export_image(image, filename=path, scale=tile["scale"], region=region)
+        # geemap reports export failures by printing, so check the result explicitly
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            raise RuntimeError(f"Earth Engine export produced no file for {tile['name']}")
+
+
+# Deterministic stand-in for Earth Engine: georeferenced random GeoTIFFs seeded by tile name
+class SyntheticBackend:
+    def __init__(self, size=(128, 128), bands=1, dtype="uint8", latency=0.0, failure_rate=0.0, seed=0):
+        self.size = size
+        self.bands = bands
+        self.dtype = np.dtype(dtype)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+
+    def fetch(self, tile, path):
+        import rasterio
+        from affine import Affine
+
+        digest = hashlib.sha256(f"{self.seed}:{tile['name']}".encode("utf-8")).digest()
+        rng = np.random.default_rng(int.from_bytes(digest[:8], "little"))
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError(f"Synthetic failure for {tile['name']}")
+
+        height, width = self.size
+        if np.issubdtype(self.dtype, np.integer):
+            data = rng.integers(0, np.iinfo(self.dtype).max, (self.bands, height, width), endpoint=True)
+        else:
+            data = rng.random((self.bands, height, width))
+        min_lon, min_lat, max_lon, max_lat = tile["bbox"]
+        transform = Affine((max_lon - min_lon) / width, 0.0, min_lon, 0.0, -(max_lat - min_lat) / height, max_lat)
+
+        with rasterio.open(path, "w", driver="GTiff", height=height, width=width, count=self.bands,
+                           dtype=self.dtype.name, crs="EPSG:4326", transform=transform) as dst:
+            dst.write(data.astype(self.dtype))
+
+
+# Backend by name (for the download scripts' --backend option)
+def make_backend(name, image_fn=None, **synthetic_options):
+    if name == "earthengine":
+        return EarthEngineBackend(image_fn)
+    if name == "synthetic":
+        return SyntheticBackend(**synthetic_options)
+    raise ValueError(f"Unknown download backend '{name}'. Choose from: {BACKENDS}")
+
+
+# Finished tiles of one output folder, saved atomically
+class DownloadManifest:
+    def __init__(self, path):
+        self.path = path
+        self.entries = self._load()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    return json.load(f).get("tiles", {})
+            except (OSError, ValueError) as e:
+                print(f" Ignoring unreadable download manifest {self.path}: {e}")
+        return {}
+
+    # A tile is done if its file is on disk and, when the manifest lists it, for the same region
+    def is_done(self, tile, path):
+        entry = self.entries.get(tile["name"])
+        if entry and entry.get("bbox") != list(tile["bbox"]):
+            return False  # Same name, different region: fetch again
+        return os.path.exists(path) and os.path.getsize(path) > 0
+
+    def record(self, tile, path, attempts):
+        with self._lock:
+            self.entries[tile["name"]] = {
+                "bbox": list(tile["bbox"]),
+                "scale": tile["scale"],
+                "bytes": os.path.getsize(path),
+                "attempts": attempts,
+                "downloaded_at": time.time(),
+            }
+            self._unsaved += 1
+            if self._unsaved >= SAVE_EVERY:
+                self._save_locked()
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"tiles": self.entries}, f, indent=1)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+
+
+# Fetch one tile to a temporary file, retrying with backoff; returns the number of attempts.
+# Partial files live in <folder>/.partial so dataset loaders listing <folder> never see them.
+def _fetch_with_retries(backend, tile, path, limiter, max_attempts):
+    tmp_path = os.path.join(os.path.dirname(path), WORK_DIR, os.path.basename(path))
+    for attempt in range(max_attempts):
+        limiter.wait()
+        try:
+            backend.fetch(tile, tmp_path)
+            os.replace(tmp_path, path)
+            return attempt + 1
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if attempt + 1 == max_attempts:
+                raise
+            delay = backoff_delay(attempt)
+            print(f" Error downloading {tile['name']} (Attempt {attempt + 1}/{max_attempts}): {e}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+# Download every tile into folder; returns {"downloaded", "skipped", "failed": [names], "seconds"}
+def download_tiles(tiles, folder, backend, workers=WORKERS, rate=REQUESTS_PER_SECOND,
+                   max_attempts=MAX_ATTEMPTS, force=False):
+    os.makedirs(os.path.join(folder, WORK_DIR), exist_ok=True)
+    manifest_path = os.path.join(folder, WORK_DIR, "manifest.json")
+    legacy_path = os.path.join(folder, "manifest.json")  # Written by earlier versions
+    if os.path.exists(legacy_path) and not os.path.exists(manifest_path):
+        os.replace(legacy_path, manifest_path)
+    manifest = DownloadManifest(manifest_path)
+    limiter = RateLimiter(rate)
+    start_time = time.perf_counter()
+
+    pending = []
+    skipped = 0
+    for tile in tiles:
+        path = os.path.join(folder, tile["name"])
+        if not force and manifest.is_done(tile, path):
+            skipped += 1
+        else:
+            pending.append((tile, path))
+    print(f" {len(pending)} tile(s) to download, {skipped} already on disk ({workers} workers, {rate}/s)")
+
+    downloaded = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tile") as executor:
+        futures = {executor.submit(_fetch_with_retries, backend, tile, path, limiter, max_attempts): (tile, path)
+                   for tile, path in pending}
+        for future in as_completed(futures):
+            tile, path = futures[future]
+            try:
+                attempts = future.result()
+            except Exception as e:
+                failed.append(tile["name"])
+                print(f" Skipping {tile['name']} after {max_attempts} failed attempts: {e}")
+                continue
+            manifest.record(tile, path, attempts)
+            downloaded += 1
+            print(f" Image saved: {path} ({downloaded + len(failed)}/{len(pending)})")
+
+    manifest.save()
+    elapsed = time.perf_counter() - start_time
+    print(f" Downloaded {downloaded}, skipped {skipped}, failed {len(failed)} in {elapsed:.1f}s")
+    return {"downloaded": downloaded, "skipped": skipped, "failed": failed, "seconds": elapsed}
+
+
+# Zip the downloaded GeoTIFFs of a folder (the manifest and partial files are left out)
+def zip_tiles(folder, zip_path):
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".tif"):
+                zipf.write(os.path.join(folder, name), name)
+    print(f" {zip_path} created!")
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Sliding-window datasets for sequence models, built on strided views instead of per-window slices.
+# Window i covers rows [i, i + time_steps) and its target is row i + time_steps. With a group column
+# (e.g. one history per organization) windows never cross from one group into the next.
+
+
+# (n - time_steps, time_steps, features) view of a (n, features) array; no data is copied
+def sliding_windows(values, time_steps):
+    values = np.asarray(values)
+    if len(values) <= time_steps:
+        return np.empty((0, time_steps) + values.shape[1:], dtype=values.dtype)
+    # sliding_window_view puts the window axis last: (n - t + 1, features, t) -> (n - t + 1, t, features)
+    return sliding_window_view(values, time_steps, axis=0).swapaxes(1, 2)[:len(values) - time_steps]
+
+
+# Start rows of the windows that lie inside one group (codes must be contiguous per group)
+def window_starts(group_codes, time_steps):
+    group_codes = np.asarray(group_codes)
+    if len(group_codes) <= time_steps:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(group_codes[:-time_steps] == group_codes[time_steps:])
+
+
+# Rows ordered so each group is contiguous (stable, so the original order is kept within a group)
+def order_rows(df, group_column=None, order_column=None):
+    keys = [column for column in (group_column, order_column) if column]
+    return df.sort_values(keys, kind="stable") if keys else df
+
+
+# Windows X (n, time_steps, len(feature_columns)) and next-row targets y (n, len(target_columns)).
+# Without grouping X is a strided view; with grouping the valid windows are gathered in one copy.
+def make_windows(df, feature_columns, target_columns, time_steps, group_column=None, order_column=None,
+                 dtype=np.float32):
+    df = order_rows(df, group_column, order_column)
+    features = df[feature_columns].to_numpy(dtype=dtype)
+    targets = features if list(target_columns) == list(feature_columns) else df[target_columns].to_numpy(dtype=dtype)
+
+    windows = sliding_windows(features, time_steps)
+    if group_column is None:
+        return windows, targets[time_steps:]
+
+    starts = window_starts(pd.factorize(df[group_column])[0], time_steps)
+    return windows[starts], targets[starts + time_steps]
+
+
+# Most recent window of each group (groups with fewer than time_steps rows are skipped), for forecasting.
+# Returns (labels, windows (groups, time_steps, features)); without grouping the label is None.
+def last_windows(df, feature_columns, time_steps, group_column=None, order_column=None, dtype=np.float32):
+    df = order_rows(df, group_column, order_column)
+    features = df[feature_columns].to_numpy(dtype=dtype)
+    if group_column is None:
+        if len(features) < time_steps:
+            return [], np.empty((0, time_steps, len(feature_columns)), dtype=dtype)
+        return [None], features[np.newaxis, -time_steps:]
+
+    if len(features) == 0:
+        return [], np.empty((0, time_steps, len(feature_columns)), dtype=dtype)
+    codes, labels = pd.factorize(df[group_column])
+    ends = np.flatnonzero(np.append(codes[1:] != codes[:-1], True)) + 1  # One past each group's last row
+    starts = np.append(0, ends[:-1])
+    keep = ends - starts >= time_steps
+    rows = (ends[keep] - time_steps)[:, np.newaxis] + np.arange(time_steps)
+    return list(labels[codes[starts[keep]]]), features[rows]
@@ -1,34 +1,36 @@
 import numpy as np
-import rasterio
 import tensorflow as tf
 import os
-import cv2
+import sys
 from tensorflow.keras import layers, models, callbacks
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from raster_io import read_band
+from dataset_cache import build_dataset_cache
+
 #  Constants
 IMG_SIZE = (128, 128)
 TRAIN_PATH = "data/water_pollution/train"
 TEST_PATH = "data/water_pollution/test"
 MODEL_PATH = "models/water_pollution_model.h5"
 HISTORY_PATH = "models/water_pollution_training_history.npy"
+CACHE_DIR = "data/water_pollution/cache"
+CACHE_VERSION = "ndwi-128-v1"  # Bump when preprocess_ndwi changes
 
-# Function to load and preprocess NDWI images
-def load_ndwi_data(folder):
-    images, labels = [], []
-    for filename in os.listdir(folder):
-        if filename.endswith(".tif"):
-            file_path = os.path.join(folder, filename)
-            with rasterio.open(file_path) as dataset:
-                ndwi = dataset.read(1)
-                ndwi = (ndwi + 1) / 2.0  # Normalize to 0–1
-                ndwi_resized = cv2.resize(ndwi, IMG_SIZE)
+# Function to preprocess one NDWI image
+def preprocess_ndwi(file_path):
+    ndwi = read_band(file_path, out_shape=IMG_SIZE)  # Read directly at IMG_SIZE
+    return (ndwi + 1) / 2.0  # Normalize to 0–1
 
-                images.append(ndwi_resized)
+#  Label: 1 = clean, 0 = polluted
+def label_for(filename):
+    return 1 if "clean" in filename.lower() else 0
 
-                #  Label: 1 = clean, 0 = polluted
-                label = 1 if "clean" in filename.lower() else 0
-                labels.append(label)
-    return np.array(images), np.array(labels)
+# Load NDWI images through the preprocessed tensor cache (only new/changed files are decoded)
+def load_ndwi_data(folder):
+    cache_dir = os.path.join(CACHE_DIR, os.path.basename(os.path.normpath(folder)))
+    return build_dataset_cache(folder, cache_dir, preprocess_ndwi, label_for, IMG_SIZE,
+                               dtype=np.float32, version=CACHE_VERSION)
 
 # Load and preprocess data
 X_train, y_train = load_ndwi_data(TRAIN_PATH)
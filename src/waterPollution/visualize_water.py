@@ -1,8 +1,10 @@
 import os
-import rasterio
-import numpy as np
+import sys
 import cv2
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from raster_io import read_band_with_stats, to_uint8
+
 # ✅ Define Input & Output Folders
 train_folder = "data/water_pollution/train"
 output_folder = "data/water_pollution/visualized"
@@ -10,18 +12,17 @@ os.makedirs(output_folder, exist_ok=True)
 
 # ✅ Function to Convert .TIF to Colorized .JPG
 def convert_tif_to_jpg(tif_path, jpg_path):
-    with rasterio.open(tif_path) as dataset:
-        image = dataset.read(1)  # Read Single-Band NDWI
+    image, stats = read_band_with_stats(tif_path)  # Read Single-Band NDWI as float32
 
-        # ✅ Proper Min-Max Scaling
-        image = ((image - np.min(image)) / (np.max(image) - np.min(image)) * 255).astype(np.uint8)
+    # ✅ Proper Min-Max Scaling
+    image = to_uint8(image, stats)
 
-        # ✅ Apply Jet Colormap (Better Contrast for NDWI)
-        image_colored = cv2.applyColorMap(image, cv2.COLORMAP_JET)
+    # ✅ Apply Jet Colormap (Better Contrast for NDWI)
+    image_colored = cv2.applyColorMap(image, cv2.COLORMAP_JET)
 
-        # ✅ Save Image as JPG
-        cv2.imwrite(jpg_path, image_colored)
-        print(f"✅ Converted: {jpg_path}")
+    # ✅ Save Image as JPG
+    cv2.imwrite(jpg_path, image_colored)
+    print(f"✅ Converted: {jpg_path}")
 
 # ✅ Process All Exported Images
 for filename in os.listdir(train_folder):
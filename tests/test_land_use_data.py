@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from land_use_data import build_parquet_cache, iter_land_use, load_land_use, land_type_codes
+
+LAND_TYPE_MAPPING = {"Forest": 1, "Wetland": 2, "Agricultural": 3, "Urban": 4}
+
+
+def test_land_type_codes_default_for_blank_and_unknown_types(tmp_path):
+    csv_path = tmp_path / "companies.csv"
+    csv_path.write_text("company,land_type,land_area\nA,Forest,1\nB,,2\nC,Moon,3\nD,Urban,4\n")
+
+    df = load_land_use(str(csv_path), use_cache=False)
+    assert str(df["land_type"].dtype) == "category"
+
+    codes = land_type_codes(df["land_type"], LAND_TYPE_MAPPING)
+    np.testing.assert_array_equal(codes, np.array([1, 0, 0, 4], dtype=np.float32))
+
+
+def test_parquet_cache_handles_integer_then_fractional_chunks(tmp_path):
+    pytest.importorskip("pyarrow")
+    rows = [f"C{i},Forest,{i},0.5,10,100,{i}" for i in range(5)] + ["C5,Urban,2.5,0.5,10,100,-3.25", "C6,,7,,,,"]
+    csv_path = tmp_path / "companies.csv"
+    csv_path.write_text("company,land_type,land_area,biodiversity_index,carbon_sequestration,economic_value,latitude\n"
+                        + "\n".join(rows) + "\n")
+    cache_dir = tmp_path / "cache"
+
+    parquet_path = build_parquet_cache(str(csv_path), cache_dir=str(cache_dir), chunksize=5)
+
+    assert parquet_path is not None
+    assert not any(name.endswith(".tmp") for name in os.listdir(cache_dir))
+    chunks = list(iter_land_use(str(csv_path), chunksize=5, use_cache=False))
+    np.testing.assert_array_equal(chunks[1]["latitude"].to_numpy(), [-3.25, np.nan])
+    assert chunks[0]["latitude"].dtype == chunks[1]["latitude"].dtype == np.float64